@@ -1,8 +1,9 @@
 import google.generativeai as genai
+import io
 import sys
 from PIL import Image  # Pillow image library
 from pydantic import BaseModel
-from typing import Optional
+from typing import BinaryIO, Optional, Union
 from config import settings
 
 
@@ -45,21 +46,28 @@ class OCRResponse(BaseModel):
 
 
 # --- Function to Analyze Card ---
-def analyze_trading_card(image_path: str) -> str:
+def analyze_trading_card(image_path: Union[str, bytes, BinaryIO]) -> str:
     """
     Analyzes a trading card image using the Gemini API.
 
     Args:
-        image_path: Path to the trading card image file.
+        image_path: Path to the trading card image file, or the image itself
+            as bytes or a binary file object (saves a disk read when the
+            caller already has it in memory).
 
     Returns:
         A string containing the analysis results from the Gemini model,
         or an error message.
     """
-    print(f"Analyzing image: {image_path}")
+    if isinstance(image_path, str):
+        print(f"Analyzing image: {image_path}")
+    else:
+        print("Analyzing image from memory")
 
     # --- 1. Validate and Load Image ---
     try:
+        if isinstance(image_path, bytes):
+            image_path = io.BytesIO(image_path)
         img = Image.open(image_path)
     except FileNotFoundError:
         return f"Error: Image file not found at '{image_path}'."
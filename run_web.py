@@ -8,9 +8,19 @@ load_dotenv()
 # ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
 # ssl_context.load_cert_chain('cert.pem', keyfile='key.pem')
 
+# Pub/sub WebSocket clients live in one process's memory, so a publish only
+# reaches clients of the worker that handled it; run more workers (e.g.
+# 2 per CPU) via WEB_WORKERS only when pub/sub isn't in use. Uvicorn
+# ignores workers when reloading, so reload is only on for one worker.
+WORKERS = int(os.environ.get("WEB_WORKERS", 1))
+
 if __name__ == "__main__":
     uvicorn.run("web.app.main:app",
         host="0.0.0.0", port=int(os.environ.get("PORT", 8050)),
         ssl_keyfile='key.pem', ssl_certfile='cert.pem',
-        reload=True
+        # uvloop + httptools (both in uvicorn[standard]) instead of the
+        # asyncio selector loop and the pure-Python h11 parser
+        loop="uvloop", http="httptools",
+        workers=WORKERS, limit_concurrency=512, backlog=2048,
+        reload=WORKERS == 1
     )
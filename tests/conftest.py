@@ -0,0 +1,30 @@
+import os
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TOKEN_FILE = (
+    '{"AUTH_TOKEN": "test-token", "REFRESH_TOKEN": "test-refresh",'
+    ' "EXPIRES_AT": 9999999999}'
+)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def workdir(tmp_path_factory):
+    """
+    Runs the tests from a scratch directory laid out like the repo root:
+    settings read config/ebay_oauth_token.json, and the app writes its
+    cache/ directory, relative to the working directory. App modules are
+    imported inside tests so they load from here.
+    """
+    path = tmp_path_factory.mktemp("workdir")
+    (path / "config").mkdir()
+    (path / "config" / "ebay_oauth_token.json").write_text(TOKEN_FILE)
+    (path / "web").symlink_to(ROOT / "web")
+
+    cwd = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(cwd)
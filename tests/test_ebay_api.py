@@ -0,0 +1,199 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+GET_ITEM_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<GetItemResponse xmlns="urn:ebay:apis:eBLBaseComponents">
+  <Timestamp>2024-01-01T00:00:00.000Z</Timestamp>
+  <Ack>Success</Ack>
+  <Item>
+    <Description>&lt;b&gt;Mint&lt;/b&gt; &amp; sleeved</Description>
+    <ItemID>123</ItemID>
+    <ItemSpecifics>
+      <NameValueList><Name>Player</Name><Value>Bob &amp; Co</Value></NameValueList>
+      <NameValueList><Name>Team</Name><Value>Cubs</Value></NameValueList>
+    </ItemSpecifics>
+    <Title>1989 Card</Title>
+    <Variations><Title>Not the item title</Title></Variations>
+  </Item>
+</GetItemResponse>
+"""
+
+GET_ITEM_FAILURE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<GetItemResponse xmlns="urn:ebay:apis:eBLBaseComponents">
+  <Ack>Failure</Ack>
+  <Errors>
+    <ShortMessage>Invalid item ID.</ShortMessage>
+    <LongMessage>Item 1 is invalid.</LongMessage>
+    <ErrorCode>17</ErrorCode>
+    <SeverityCode>Error</SeverityCode>
+    <ErrorClassification>RequestError</ErrorClassification>
+  </Errors>
+  <Errors>
+    <ShortMessage>Heads up</ShortMessage>
+    <SeverityCode>Warning</SeverityCode>
+  </Errors>
+</GetItemResponse>
+"""
+
+
+class FakeRaw(io.BytesIO):
+    decode_content = False
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.raw = FakeRaw(body)
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+@pytest.fixture
+def ebay_api():
+    from web.app import ebay_api
+
+    ebay_api._item_details_cache.clear()
+    return ebay_api
+
+
+@pytest.fixture
+def get_item(ebay_api, monkeypatch):
+    """
+    Serves canned GetItem bodies; returns the list of responses handed out.
+    """
+    responses = []
+
+    def serve(body: bytes):
+        def post(url, headers=None, data=None, stream=False):
+            response = FakeResponse(body)
+            responses.append(response)
+            return response
+
+        monkeypatch.setattr(ebay_api._SESSION, "post", post)
+        return responses
+
+    monkeypatch.setattr(ebay_api, "_get_trading_api_headers", lambda call: {})
+    return serve
+
+
+def test_iterparse_get_item_extracts_item_fields(ebay_api):
+    source = io.BytesIO(GET_ITEM_RESPONSE)
+    ack, errors, item = ebay_api._iterparse_get_item(source)
+
+    assert ack == "Success"
+    assert errors == []
+    assert item["title"] == "1989 Card"
+    assert item["description"] == "<b>Mint</b> & sleeved"
+    assert "<Name>Player</Name>" in item["item_specifics"]
+    assert "Bob &amp; Co" in item["item_specifics"]
+
+
+def test_iterparse_get_item_collects_errors(ebay_api):
+    source = io.BytesIO(GET_ITEM_FAILURE)
+    ack, errors, item = ebay_api._iterparse_get_item(source)
+
+    assert ack == "Failure"
+    assert item is None
+    assert errors[0] == {
+        "short_message": "Invalid item ID.",
+        "long_message": "Item 1 is invalid.",
+        "error_code": "17",
+        "severity": "Error",
+        "classification": "RequestError",
+    }
+    assert errors[1]["severity"] == "Warning"
+    assert errors[1]["long_message"] == "No details available"
+
+
+def test_get_item_details_returns_item(ebay_api, get_item):
+    get_item(GET_ITEM_RESPONSE)
+
+    title, description, item_specifics, error = ebay_api.get_item_details("123")
+
+    assert error is None
+    assert title == "1989 Card"
+    assert description == "<b>Mint</b> & sleeved"
+    assert "xmlns" not in item_specifics
+    assert item_specifics.startswith("    <ItemSpecifics>")
+
+
+def test_get_item_details_returns_structured_errors(ebay_api, get_item):
+    get_item(GET_ITEM_FAILURE)
+
+    title, description, item_specifics, error = ebay_api.get_item_details("1")
+
+    assert (title, description, item_specifics) == (None, None, None)
+    assert error["type"] == "structured"
+    assert [e["short_message"] for e in error["errors"]] == [
+        "Invalid item ID.",
+        "Heads up",
+    ]
+
+
+def test_get_item_details_drains_the_body(ebay_api, get_item):
+    # Parsing stops at </Item>; whatever follows must still be read so the
+    # pooled connection can be reused
+    padding = b"<!--" + b"x" * (512 * 1024) + b"-->"
+    body = GET_ITEM_RESPONSE.replace(
+        b"</GetItemResponse>", padding + b"</GetItemResponse>"
+    )
+    responses = get_item(body)
+
+    ebay_api.get_item_details("123")
+
+    raw = responses[0].raw
+    assert raw.tell() == len(body)
+
+
+@pytest.mark.parametrize(
+    "title, item_specifics_xml",
+    [
+        ("1989 Card", "<ItemSpecifics><NameValueList>"),
+        ("1989 Card\x00", ""),
+    ],
+)
+def test_add_new_item_reports_unbuildable_requests(
+    ebay_api, monkeypatch, title, item_specifics_xml
+):
+    monkeypatch.setattr(ebay_api, "_get_trading_api_headers", lambda call: {})
+
+    new_item_id, fees, error = ebay_api.add_new_item(
+        title, "Description", item_specifics_xml
+    )
+
+    assert (new_item_id, fees) == (None, None)
+    assert error["type"] == "structured"
+    assert error["errors"][0]["error_code"] == "REQUEST_BUILD_ERROR"
+
+
+def test_concurrent_image_search_cache_writes(ebay_api, tmp_path, monkeypatch):
+    monkeypatch.setattr(ebay_api, "IMAGE_SEARCH_CACHE_DIR", str(tmp_path))
+    cache_path = str(tmp_path / "same-image.json")
+    results = [{"itemSummaries": [{"itemId": str(i)}] * 200} for i in range(8)]
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda r: ebay_api._write_image_search_cache(cache_path, r), results))
+
+    assert ebay_api._read_image_search_cache(cache_path) in results
+    assert [p.name for p in tmp_path.iterdir()] == ["same-image.json"]
+
+
+def test_failed_image_search_cache_write_cleans_up(ebay_api, tmp_path, monkeypatch):
+    monkeypatch.setattr(ebay_api, "IMAGE_SEARCH_CACHE_DIR", str(tmp_path))
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ebay_api.os, "replace", fail)
+
+    ebay_api._write_image_search_cache(str(tmp_path / "image.json"), {"a": 1})
+
+    assert not list(tmp_path.iterdir())
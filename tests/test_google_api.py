@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+
+class FakeWorksheet:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def append_rows(self, rows, **kwargs):
+        self.calls.append(rows)
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def google_api(monkeypatch):
+    from web.app import google_api
+
+    monkeypatch.setattr(google_api, "_order_queue", None)
+    return google_api
+
+
+def order(order_id):
+    return {"orderId": order_id, "lineItems": [{"title": f"Card {order_id}"}]}
+
+
+async def add_concurrently(google_api, order_ids):
+    writer = google_api.start_sheets_writer()
+    try:
+        return await asyncio.gather(
+            *(google_api.add_orders_to_sheets([order(i)]) for i in order_ids),
+            return_exceptions=True,
+        )
+    finally:
+        writer.cancel()
+
+
+def test_queued_orders_share_one_append(google_api, monkeypatch):
+    worksheet = FakeWorksheet()
+    monkeypatch.setattr(google_api, "_get_worksheet", lambda: worksheet)
+
+    results = asyncio.run(add_concurrently(google_api, ["1", "2", "3"]))
+
+    assert all(result["message"] for result in results)
+    assert len(worksheet.calls) == 1
+    assert [row[1] for row in worksheet.calls[0]] == ["1", "2", "3"]
+
+
+def test_failed_append_fails_every_queued_order(google_api, monkeypatch):
+    worksheet = FakeWorksheet(error=RuntimeError("quota"))
+    monkeypatch.setattr(google_api, "_get_worksheet", lambda: worksheet)
+
+    results = asyncio.run(add_concurrently(google_api, ["1", "2"]))
+
+    assert len(worksheet.calls) == 1
+    assert [result.status_code for result in results] == [500, 500]
+    assert all("quota" in result.detail for result in results)
+
+
+def test_order_titles_are_newline_separated(google_api):
+    row = google_api._order_to_row(
+        {"orderId": "1", "lineItems": [{"title": "Card A"}, {"title": "Card B"}]}
+    )
+
+    assert row[2] == "Card A\nCard B"
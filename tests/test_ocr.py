@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+import pytest
+
+CARD = {
+    "player_name": "Bob",
+    "team_name": "Cubs",
+    "card_set_year": "1989",
+    "card_number": "1",
+    "serial_number": None,
+    "card_type": None,
+    "other": None,
+}
+
+
+@pytest.fixture
+def main():
+    from web.app import main
+
+    return main
+
+
+@pytest.fixture
+def ocr_calls(main, monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def slow_ocr(content):
+        with lock:
+            calls.append(content)
+        # Long enough for every concurrent upload to arrive mid-run
+        time.sleep(0.5)
+        return CARD
+
+    monkeypatch.setattr(main, "analyze_trading_card", slow_ocr)
+    return calls
+
+
+def test_concurrent_identical_uploads_run_ocr_once(main, ocr_calls):
+    from fastapi.testclient import TestClient
+
+    image = b"\xff\xd8" + uuid.uuid4().bytes
+
+    def upload(client):
+        files = {"file": ("card.jpg", image, "image/jpeg")}
+        return client.post("/api/ocr-image", files=files)
+
+    with TestClient(main.app) as client, ThreadPoolExecutor(4) as pool:
+        responses = list(pool.map(upload, [client] * 4))
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert all(r.json()["player_name"] == "Bob" for r in responses)
+    assert ocr_calls == [image]
+    assert not main._inflight_ocr
+
+
+def test_legacy_md5_cache_is_migrated(main, ocr_calls):
+    from fastapi.testclient import TestClient
+
+    image = b"\xff\xd8" + uuid.uuid4().bytes
+    legacy = f"cache/{hashlib.md5(image).hexdigest()}"
+    with open(f"{legacy}.jpg", "wb") as f:
+        f.write(image)
+    with open(f"{legacy}.json", "wb") as f:
+        f.write(orjson.dumps(CARD))
+
+    main._migrate_legacy_ocr_cache()
+
+    file_hash = hashlib.blake2b(image, digest_size=16).hexdigest()
+    assert not os.path.exists(f"{legacy}.jpg")
+    assert not os.path.exists(f"{legacy}.json")
+    assert os.path.exists(main._cache_path(file_hash, "jpg"))
+
+    with TestClient(main.app) as client:
+        files = {"file": ("card.jpg", image, "image/jpeg")}
+        response = client.post("/api/ocr-image", files=files)
+
+    assert response.json()["cache_hit"] is True
+    assert response.json()["player_name"] == "Bob"
+    assert ocr_calls == []
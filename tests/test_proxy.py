@@ -0,0 +1,232 @@
+import gzip
+import os
+
+import httpx
+import pytest
+
+IMAGE = b"\x89PNG" + b"x" * 1000
+UPSTREAM_ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+BOMB = gzip.compress(b"x" * (6 * 1024 * 1024))
+
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    from web.app import main
+
+    monkeypatch.setattr(main, "PROXY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "_proxy_cache_bytes", 0)
+    main._proxy_mem_cache.clear()
+    monkeypatch.setattr(main, "_proxy_mem_cache_bytes", 0)
+    yield main
+    main._proxy_mem_cache.clear()
+
+
+@pytest.fixture
+def upstream():
+    """
+    Records the proxied requests; each path maps to (headers, body).
+    """
+    routes = {
+        "/a.png": ({"content-type": "image/png"}, IMAGE),
+        "/b.png": ({"content-type": "image/png"}, IMAGE[::-1]),
+        # Streamed through rather than buffered
+        "/sized.png": (
+            {"content-type": "image/png", "content-length": str(len(IMAGE))},
+            IMAGE,
+        ),
+        # Streamed, with validators; answers conditional requests with a 304
+        "/tagged.png": (
+            {
+                "content-type": "image/png",
+                "content-length": str(len(IMAGE)),
+                "etag": UPSTREAM_ETAG,
+                "last-modified": LAST_MODIFIED,
+            },
+            IMAGE,
+        ),
+        # Content-Length counts the compressed bytes; the image itself is
+        # over the proxy's cap
+        "/liar.png": (
+            {
+                "content-type": "image/png",
+                "content-encoding": "gzip",
+                "content-length": str(len(BOMB)),
+            },
+            BOMB,
+        ),
+    }
+    seen = []
+    conditional = []
+
+    async def handler(request):
+        seen.append(request.url.path)
+        conditional.append(request.headers.get("if-none-match"))
+        headers, body = routes[request.url.path]
+        if request.headers.get("if-none-match") == headers.get("etag", object()):
+            return httpx.Response(304, headers={"etag": headers["etag"]})
+        stream = httpx.ByteStream(body)
+        return httpx.Response(200, headers=headers, stream=stream)
+
+    handler.seen = seen
+    handler.conditional = conditional
+    return handler
+
+
+@pytest.fixture
+def client(main, upstream):
+    from fastapi.testclient import TestClient
+
+    with TestClient(main.app) as client:
+        real = main.app.state.http
+        main.app.state.http = httpx.AsyncClient(
+            transport=httpx.MockTransport(upstream)
+        )
+        yield client
+        main.app.state.http = real
+
+
+def proxy(client, path, **kwargs):
+    return client.get(
+        "/api/image-proxy", params={"url": f"https://img.test{path}"}, **kwargs
+    )
+
+
+def test_lying_content_length_gets_413(client, tmp_path):
+    response = proxy(client, "/liar.png")
+
+    assert response.status_code == 413
+    assert not list(tmp_path.iterdir())
+
+
+def test_cache_hit_skips_upstream(client, upstream):
+    first = proxy(client, "/a.png")
+    second = proxy(client, "/a.png")
+
+    assert first.content == second.content == IMAGE
+    assert upstream.seen == ["/a.png"]
+    assert second.headers["etag"]
+
+
+def test_streamed_image_is_cached(client, upstream):
+    first = proxy(client, "/sized.png")
+    second = proxy(client, "/sized.png")
+
+    assert first.content == second.content == IMAGE
+    assert upstream.seen == ["/sized.png"]
+    assert second.headers["etag"]
+
+
+def test_cache_hit_from_disk(client, main, upstream):
+    proxy(client, "/a.png")
+    main._proxy_mem_cache.clear()
+
+    response = proxy(client, "/a.png")
+
+    assert response.content == IMAGE
+    assert response.headers["content-type"] == "image/png"
+    assert upstream.seen == ["/a.png"]
+
+
+def test_if_none_match_returns_304(client):
+    proxy(client, "/a.png")
+    etag = proxy(client, "/a.png").headers["etag"]
+
+    response = proxy(client, "/a.png", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert proxy(client, "/a.png", headers={"If-None-Match": '"stale"'}).content
+
+
+def test_etag_follows_content(client, main):
+    proxy(client, "/a.png")
+    proxy(client, "/b.png")
+
+    etags = {proxy(client, path).headers["etag"] for path in ("/a.png", "/b.png")}
+
+    assert len(etags) == 2
+
+
+def test_writes_past_the_cap_evict_oldest(client, main, monkeypatch, tmp_path):
+    a, b = (main._proxy_cache_key(f"https://img.test{p}") for p in ("/a.png", "/b.png"))
+    proxy(client, "/a.png")
+    # mtime granularity can be coarse; make sure a is the older write
+    os.utime(tmp_path / a, (0, 0))
+    monkeypatch.setattr(main, "PROXY_CACHE_MAX_BYTES", len(IMAGE) + 1)
+    monkeypatch.setattr(main, "PROXY_CACHE_TRIM_TO", len(IMAGE) + 1)
+
+    proxy(client, "/b.png")
+
+    assert not (tmp_path / a).exists()
+    assert not (tmp_path / f"{a}.meta").exists()
+    assert (tmp_path / b).exists()
+    assert main._proxy_cache_bytes == len(IMAGE)
+
+
+def test_expired_entries_are_refetched(client, main, upstream, tmp_path):
+    proxy(client, "/a.png")
+    key = main._proxy_cache_key("https://img.test/a.png")
+    meta, body, _ = main._proxy_mem_cache[key]
+    main._proxy_mem_cache[key] = (meta, body, 0.0)
+    old = main.time.time() - main.PROXY_CACHE_TTL - 1
+    os.utime(tmp_path / key, (old, old))
+
+    assert main._read_proxy_cache(key)[2] < main.time.time()
+    assert proxy(client, "/a.png").content == IMAGE
+    assert upstream.seen == ["/a.png", "/a.png"]
+    assert main._proxy_mem_cache_bytes == len(IMAGE)
+
+
+def test_ttl_matches_max_age(main):
+    max_age = f"max-age={main.PROXY_CACHE_TTL}"
+
+    assert max_age in main.PROXY_CACHE_HEADERS["Cache-Control"]
+
+
+def test_streamed_response_forwards_upstream_validators(client):
+    response = proxy(client, "/tagged.png")
+
+    assert response.headers["etag"] == UPSTREAM_ETAG
+    assert response.headers["last-modified"] == LAST_MODIFIED
+
+
+def test_upstream_etag_gets_304_from_cache(client, upstream):
+    proxy(client, "/tagged.png")
+
+    response = proxy(client, "/tagged.png", headers={"If-None-Match": UPSTREAM_ETAG})
+
+    assert response.status_code == 304
+    assert upstream.seen == ["/tagged.png"]
+
+
+def test_uncached_conditional_request_passes_upstream_304(client, upstream):
+    response = proxy(client, "/tagged.png", headers={"If-None-Match": UPSTREAM_ETAG})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == UPSTREAM_ETAG
+    assert upstream.conditional == [UPSTREAM_ETAG]
+
+
+def test_stale_entry_is_revalidated_upstream(client, main, upstream, tmp_path):
+    proxy(client, "/tagged.png")
+    key = main._proxy_cache_key("https://img.test/tagged.png")
+    main._proxy_mem_cache.clear()
+    old = main.time.time() - main.PROXY_CACHE_TTL - 1
+    os.utime(tmp_path / key, (old, old))
+
+    revalidated = proxy(client, "/tagged.png", headers={"If-None-Match": UPSTREAM_ETAG})
+    refreshed = proxy(client, "/tagged.png")
+
+    assert revalidated.status_code == 304
+    assert refreshed.content == IMAGE
+    # One conditional refetch, then served from the refreshed entry
+    assert upstream.conditional == [None, UPSTREAM_ETAG]
+    assert os.stat(tmp_path / key).st_mtime > old
+
+
+def test_proxy_writes_are_not_tracked_as_known_files(client, main, tmp_path):
+    proxy(client, "/a.png")
+    proxy(client, "/sized.png")
+
+    assert not any(path.startswith(str(tmp_path)) for path in main._known_cache_files)
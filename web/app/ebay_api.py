@@ -1,8 +1,20 @@
+import os
+import copy
+import time
+import uuid
+import threading
+import logging
+import hashlib
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
 import base64
-import uuid
+from concurrent.futures import ThreadPoolExecutor
 from .logger import setup_logger
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
+from lxml.builder import ElementMaker
 
 from web.app.ebay_auth import get_ebay_token, get_ebay_user_token
 
@@ -16,6 +28,77 @@ EBAY_TRADING_API_URL = "https://api.ebay.com/ws/api.dll"
 SITE_ID = "0"  # 0 for US
 COMPATIBILITY_LEVEL = "967"  # Use a relevant version based on documentation
 
+# Namespace map for Trading API XML responses
+NS = {"ebay": "urn:ebay:apis:eBLBaseComponents"}
+
+# Builds elements in the Trading API namespace for request documents
+_E = ElementMaker(namespace=NS["ebay"], nsmap={None: NS["ebay"]})
+
+# Precompiled lookups for elements that sit directly under the response root
+_XP_ACK = ET.XPath("ebay:Ack", namespaces=NS)
+_XP_ERRORS = ET.XPath("ebay:Errors", namespaces=NS)
+
+# Clark-notation tags used when streaming GetItem responses with iterparse
+_EBAY_NS = "{urn:ebay:apis:eBLBaseComponents}"
+_ACK_TAG = _EBAY_NS + "Ack"
+_ERRORS_TAG = _EBAY_NS + "Errors"
+_ITEM_TAG = _EBAY_NS + "Item"
+_TITLE_TAG = _EBAY_NS + "Title"
+_DESCRIPTION_TAG = _EBAY_NS + "Description"
+_ITEM_SPECIFICS_TAG = _EBAY_NS + "ItemSpecifics"
+
+# Content types for picture uploads, keyed by lowercase file extension
+_PICTURE_CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+}
+
+# Fulfillment API order listing
+ORDERS_URL = "https://api.ebay.com/sell/fulfillment/v1/order"
+ORDERS_PAGE_LIMIT = 100  # Maximum allowed limit
+ORDERS_MAX_WORKERS = 8  # Concurrent page fetches once the total is known
+
+# Shared session so every eBay call reuses pooled connections (HTTP keep-alive)
+# instead of paying a new TCP + TLS handshake; transient errors are retried.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# Images smaller than this, or of other types, are rejected by eBay's image search
+MIN_IMG_BYTES = 8192
+SEARCH_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+# Image search results are cached on disk keyed by the image's content hash
+IMAGE_SEARCH_CACHE_DIR = "cache/ebay_img"
+IMAGE_SEARCH_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# Static header templates; callers copy these and only set the per-call values
+_BROWSE_HEADERS_TEMPLATE = {
+    "Content-Type": "application/json",
+    "X-EBAY-C-MARKETPLACE-ID": MARKETPLACE_ID,
+}
+_ORDERS_HEADERS_TEMPLATE = {
+    "Content-Type": "application/json",
+}
+_TRADING_HEADERS_TEMPLATE = {
+    "Content-Type": "text/xml",
+    "X-EBAY-API-SITEID": SITE_ID,
+    "X-EBAY-API-COMPATIBILITY-LEVEL": COMPATIBILITY_LEVEL,
+}
+
 
 def _get_trading_api_headers(call_name: str) -> dict:
     """
@@ -23,82 +106,249 @@ def _get_trading_api_headers(call_name: str) -> dict:
     """
     user_token = get_ebay_user_token()  # Get the valid user token
 
-    headers = {
-        "Content-Type": "text/xml",
-        "X-EBAY-API-SITEID": SITE_ID,
-        "X-EBAY-API-COMPATIBILITY-LEVEL": COMPATIBILITY_LEVEL,
-        "X-EBAY-API-CALL-NAME": call_name,
-        "X-EBAY-API-IAF-TOKEN": f"{user_token}",  # Use the user token
-    }
+    headers = _TRADING_HEADERS_TEMPLATE.copy()
+    headers["X-EBAY-API-CALL-NAME"] = call_name
+    headers["X-EBAY-API-IAF-TOKEN"] = user_token  # Use the user token
     return headers
 
 
+def _read_image_search_cache(cache_path: str):
+    """
+    Returns cached search results for an image, or None if missing or stale.
+    """
+    try:
+        if time.time() - os.path.getmtime(cache_path) > IMAGE_SEARCH_CACHE_TTL:
+            return None
+        with open(cache_path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_image_search_cache(cache_path: str, results: dict):
+    # Concurrent searches for the same image each write their own temp file
+    tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(IMAGE_SEARCH_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(results))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Failed to cache image search results: %s", e)
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
 def search_ebay_by_image(image_bytes: bytes, image_type: str):
-    headers = {
-        "Authorization": f"Bearer {get_ebay_token()}",
-        "Content-Type": "application/json",
-        "X-EBAY-C-MARKETPLACE-ID": MARKETPLACE_ID,
-    }
+    # Skip the encode and round trip for images eBay can't do anything with
+    if len(image_bytes) < MIN_IMG_BYTES or image_type not in SEARCH_IMAGE_TYPES:
+        return {"itemSummaries": []}
 
-    url = "https://api.ebay.com/buy/browse/v1/item_summary/search_by_image"
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    cache_path = os.path.join(IMAGE_SEARCH_CACHE_DIR, f"{image_hash}.json")
+    cached = _read_image_search_cache(cache_path)
+    if cached is not None:
+        return cached
 
-    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    headers = _BROWSE_HEADERS_TEMPLATE.copy()
+    headers["Authorization"] = f"Bearer {get_ebay_token()}"
+
+    url = "https://api.ebay.com/buy/browse/v1/item_summary/search_by_image"
 
     params = {"filter": "itemEndDate:[..2025-05-20T00:00:00Z]"}
-    payload = {"image": image_base64}  # The API expects base64-encoded string
+    # The API expects {"image": "<base64>"}; base64 output never needs JSON
+    # escaping, so build the body as bytes rather than str + json.dumps copies
+    payload = b'{"image":"' + base64.b64encode(image_bytes) + b'"}'
 
-    response = requests.post(url, headers=headers, json=payload, params=params)
+    response = _SESSION.post(url, headers=headers, data=payload, params=params)
     response.raise_for_status()
-    return response.json()
+    results = orjson.loads(response.content)
 
+    _write_image_search_cache(cache_path, results)
+    return results
 
-def get_ebay_orders():
-    headers = {
-        "Authorization": f"Bearer {get_ebay_user_token()}",
-        "Content-Type": "application/json",
+
+def _fetch_orders_page(headers: dict, offset: int) -> dict:
+    params = {
+        "limit": ORDERS_PAGE_LIMIT,
+        "offset": offset,
+        # "filter": "orderfulfillmentstatus:{FULFILLED|IN_PROGRESS}",
     }
+    response = _SESSION.get(ORDERS_URL, headers=headers, params=params)
+    response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+    # Pages of 100 orders run to hundreds of KB; orjson parses the raw bytes
+    return orjson.loads(response.content)
+
+
+def get_ebay_orders():
+    """
+    Fetches all orders, requesting the remaining pages concurrently once the
+    first page has reported the total. Returns whatever was collected if a
+    page fails.
+    """
+    headers = _ORDERS_HEADERS_TEMPLATE.copy()
+    headers["Authorization"] = f"Bearer {get_ebay_user_token()}"
 
-    url = "https://api.ebay.com/sell/fulfillment/v1/order"
     orders = []
-    offset = 0
-    limit = 100  # Maximum allowed limit
-
-    while True:
-        params = {
-            "limit": limit,
-            "offset": offset,
-            # "filter": "orderfulfillmentstatus:{FULFILLED|IN_PROGRESS}",
-        }
 
-        response = requests.get(url, headers=headers, params=params)
+    try:
+        data = _fetch_orders_page(headers, 0)
+        orders.extend(data.get("orders", []))
+
+        total = data.get("total")
+        if total is None or len(orders) >= total:
+            return orders
+
+        offsets = range(ORDERS_PAGE_LIMIT, total, ORDERS_PAGE_LIMIT)
+        workers = min(ORDERS_MAX_WORKERS, len(offsets))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = executor.map(
+                lambda offset: _fetch_orders_page(headers, offset), offsets
+            )
+            for page in pages:
+                orders.extend(page.get("orders", []))
 
-        try:
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-            data = response.json()
-            orders.extend(data.get("orders", []))
-            break
-            if data.get("total") is None or len(orders) >= data.get("total"):
+    except requests.exceptions.HTTPError as e:
+        logger.error("HTTP error occurred: %s", e)
+        logger.error("Response status code: %s", e.response.status_code)
+        logger.error("Response text: %s", e.response.text)
+
+    except Exception as e:
+        logger.error("An error occurred: %s", e)
+
+    return orders
+
+
+# GetItem results keyed by item ID: {item_id: (expires_at, result)}
+ITEM_DETAILS_CACHE_TTL = 300  # seconds
+ITEM_DETAILS_CACHE_SIZE = 1024
+_item_details_cache = {}
+_ITEM_DETAILS_LOCK = threading.Lock()
+
+
+def _get_ack(root):
+    """
+    Returns the Ack value of a Trading API response, or None if missing.
+    """
+    ack = _XP_ACK(root)
+    return ack[0].text if ack else None
+
+
+# (key, child tag, default) for each field reported on an <Errors> element
+_ERROR_FIELDS = (
+    ("short_message", _EBAY_NS + "ShortMessage", "Unknown error"),
+    ("long_message", _EBAY_NS + "LongMessage", "No details available"),
+    ("error_code", _EBAY_NS + "ErrorCode", "N/A"),
+    ("severity", _EBAY_NS + "SeverityCode", "Unknown"),
+    ("classification", _EBAY_NS + "ErrorClassification", "Unknown"),
+)
+
+
+def _parse_error(error) -> dict:
+    """
+    Converts a single <Errors> element into an error dict.
+    """
+    return {
+        key: error.findtext(tag, default) for key, tag, default in _ERROR_FIELDS
+    }
+
+
+def _extract_errors(root) -> list:
+    """
+    Extracts all <Errors> entries (errors and warnings) from a Trading API response.
+    """
+    return [_parse_error(error) for error in _XP_ERRORS(root)]
+
+
+def _iterparse_get_item(source):
+    """
+    Streams a GetItem response and keeps only the parts get_item_details needs.
+
+    Every top-level element and every child of <Item> is freed as soon as it
+    has been looked at, so the large parts of the response (compatibility
+    lists, shipping and seller details) never stay in memory. Parsing stops
+    once </Item> has been seen.
+
+    Returns:
+        tuple: (ack, errors, item) where item is None if no <Item> was found,
+        otherwise a dict with the Title/Description text and the ItemSpecifics
+        element serialized to a string (or None for any that are missing).
+    """
+    ack = None
+    errors = []
+    item = None
+
+    for _, elem in ET.iterparse(source, events=("end",)):
+        parent = elem.getparent()
+        if parent is None:
+            break  # end of the response root
+
+        tag = elem.tag
+        if parent.getparent() is None:
+            # Direct child of the response root
+            if tag == _ACK_TAG:
+                ack = elem.text
+            elif tag == _ERRORS_TAG:
+                errors.append(_parse_error(elem))
+            elif tag == _ITEM_TAG:
+                if item is None:
+                    item = {}
                 break
+        elif parent.tag == _ITEM_TAG and parent.getparent().getparent() is None:
+            if item is None:
+                item = {}
+            if tag == _TITLE_TAG:
+                item["title"] = elem.text
+            elif tag == _DESCRIPTION_TAG:
+                item["description"] = elem.text
+            elif tag == _ITEM_SPECIFICS_TAG:
+                item["item_specifics"] = ET.tostring(
+                    elem, encoding="unicode", with_tail=False
+                )
+        else:
+            # Descendants are freed along with their top-level ancestor
+            continue
 
-            offset += limit
+        elem.clear()
+        while elem.getprevious() is not None:
+            del parent[0]
 
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP error occurred: {e}")
-            print(f"Response status code: {response.status_code}")
-            print(f"Response text: {response.text}")
-            break  # Exit the loop if there's an error
+    return ack, errors, item
 
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            break  # Exit the loop if there's an error
 
-    return orders
+def _drain(raw, chunk_size: int = 64 * 1024):
+    """
+    Reads and discards whatever is left of a streamed response body.
+    """
+    for _ in iter(lambda: raw.read(chunk_size), b""):
+        pass
 
 
 def get_item_details(item_id):
     """
     Fetches item details (Title, Description, and ItemSpecifics) from eBay using GetItem API.
+    Successful lookups are cached for ITEM_DETAILS_CACHE_TTL seconds; errors are not.
     """
+    key = str(item_id)
+    now = time.monotonic()
+    cached = _item_details_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    result = _fetch_item_details(item_id)
+    if result[3] is None:
+        with _ITEM_DETAILS_LOCK:
+            _item_details_cache.pop(key, None)
+            if len(_item_details_cache) >= ITEM_DETAILS_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                del _item_details_cache[next(iter(_item_details_cache))]
+            _item_details_cache[key] = (now + ITEM_DETAILS_CACHE_TTL, result)
+    return result
+
+
+def _fetch_item_details(item_id):
     url = EBAY_TRADING_API_URL
     headers = _get_trading_api_headers("GetItem")  # Use OAuth2 headers
     body = f"""<?xml version="1.0" encoding="utf-8"?>
@@ -110,59 +360,19 @@ def get_item_details(item_id):
 </GetItemRequest>"""
 
     try:
-        response = requests.post(
-            url, headers=headers, data=body.encode("utf-8")
-        )
-        response.raise_for_status()  # Raise an exception for bad status codes
-        xml_string = response.text
-        # logger.info(f"Received GetItem response from eBay API: {xml_string}")
-
-        root = ET.fromstring(xml_string)
-        ns = {"ebay": "urn:ebay:apis:eBLBaseComponents"}
+        # Stream the body straight into the parser instead of buffering it
+        with _SESSION.post(
+            url, headers=headers, data=body.encode("utf-8"), stream=True
+        ) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes
+            response.raw.decode_content = True  # undo gzip/deflate transparently
+            ack, error_data, item = _iterparse_get_item(response.raw)
+            # The parser stops at </Item>; read the rest so urllib3 can put
+            # the connection back in the pool instead of discarding it
+            _drain(response.raw)
 
         # Check for eBay API errors first
-        ack = root.find(".//ebay:Ack", ns)
-        if ack is not None and ack.text != "Success":
-            errors = root.findall(".//ebay:Errors", ns)
-            error_data = []
-            for error in errors:
-                short_message_elem = error.find(".//ebay:ShortMessage", ns)
-                long_message_elem = error.find(".//ebay:LongMessage", ns)
-                error_code_elem = error.find(".//ebay:ErrorCode", ns)
-                severity_elem = error.find(".//ebay:SeverityCode", ns)
-                classification_elem = error.find(
-                    ".//ebay:ErrorClassification", ns
-                )
-
-                error_info = {
-                    "short_message": (
-                        short_message_elem.text
-                        if short_message_elem is not None
-                        else "Unknown error"
-                    ),
-                    "long_message": (
-                        long_message_elem.text
-                        if long_message_elem is not None
-                        else "No details available"
-                    ),
-                    "error_code": (
-                        error_code_elem.text
-                        if error_code_elem is not None
-                        else "N/A"
-                    ),
-                    "severity": (
-                        severity_elem.text
-                        if severity_elem is not None
-                        else "Unknown"
-                    ),
-                    "classification": (
-                        classification_elem.text
-                        if classification_elem is not None
-                        else "Unknown"
-                    ),
-                }
-                error_data.append(error_info)
-
+        if ack is not None and ack != "Success":
             return (
                 None,
                 None,
@@ -171,27 +381,13 @@ def get_item_details(item_id):
             )
 
         # If success, extract title, description, and item specifics
-        item_element = root.find(".//ebay:Item", ns)
-        if item_element is not None:
-            title_element = item_element.find(".//ebay:Title", ns)
-            description_element = item_element.find(".//ebay:Description", ns)
-            item_specifics_element = item_element.find(
-                ".//ebay:ItemSpecifics", ns
-            )
+        if item is not None:
+            title = item.get("title", "N/A")
+            description = item.get("description", "N/A")
 
-            title = title_element.text if title_element is not None else "N/A"
-            description = (
-                description_element.text
-                if description_element is not None
-                else "N/A"
-            )
-
-            # Convert ItemSpecifics element to XML string if it exists
-            item_specifics_xml = ""
-            if item_specifics_element is not None:
-                item_specifics_xml = ET.tostring(
-                    item_specifics_element, encoding="unicode"
-                )
+            # ItemSpecifics arrives as an XML string if it exists
+            item_specifics_xml = item.get("item_specifics") or ""
+            if item_specifics_xml:
                 # Remove the namespace declaration to clean it up for insertion
                 item_specifics_xml = item_specifics_xml.replace(
                     ' xmlns="urn:ebay:apis:eBLBaseComponents"', ""
@@ -248,14 +444,13 @@ def get_item_details(item_id):
 def upload_site_hosted_pictures(image_file, filename):
     """
     Uploads an image to eBay using UploadSiteHostedPictures API.
+    image_file may be bytes or a binary file object; file objects are read in
+    chunks as the request is sent rather than loaded up front.
     Returns the FullURL on success or error data on failure.
     """
     url = EBAY_TRADING_API_URL
     headers = _get_trading_api_headers("UploadSiteHostedPictures")
 
-    # Remove Content-Type from headers as we'll set it for multipart
-    headers.pop("Content-Type", None)
-
     # Create the XML payload
     xml_payload = """<?xml version="1.0" encoding="utf-8"?>
 <UploadSiteHostedPicturesRequest xmlns="urn:ebay:apis:eBLBaseComponents">
@@ -263,107 +458,45 @@ def upload_site_hosted_pictures(image_file, filename):
     <ExtensionInDays>20</ExtensionInDays>
 </UploadSiteHostedPicturesRequest>"""
 
-    # Create multipart form data
-    boundary = f"----FormBoundary{uuid.uuid4().hex}"
-    headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
-
-    # Build multipart body
-    body_parts = []
-
-    # Add XML payload
-    body_parts.append(f"--{boundary}\r\n")
-    body_parts.append(
-        'Content-Disposition: form-data; name="XML Payload"\r\n\r\n'
-    )
-    body_parts.append(xml_payload)
-    body_parts.append("\r\n")
-
-    # Add image file
-    body_parts.append(f"--{boundary}\r\n")
-    body_parts.append(
-        f'Content-Disposition: form-data; name="image"; filename="{filename}"\r\n'
-    )
-
     # Determine content type based on file extension
-    if filename.lower().endswith(".jpg") or filename.lower().endswith(".jpeg"):
-        content_type = "image/jpeg"
-    elif filename.lower().endswith(".png"):
-        content_type = "image/png"
-    elif filename.lower().endswith(".gif"):
-        content_type = "image/gif"
-    else:
-        content_type = "image/jpeg"  # Default
-
-    body_parts.append(f"Content-Type: {content_type}\r\n\r\n")
-
-    # Convert string parts to bytes
-    body_bytes = "".join(body_parts).encode("utf-8")
+    ext = filename.rpartition(".")[2].lower()
+    content_type = _PICTURE_CONTENT_TYPES.get(ext, "image/jpeg")  # Default
+
+    # Create multipart form data; the encoder streams the parts to the socket
+    # instead of concatenating them (and the image) into one body buffer
+    body = MultipartEncoder(
+        fields=[
+            ("XML Payload", xml_payload),
+            ("image", (filename, image_file, content_type)),
+        ]
+    )
+    headers["Content-Type"] = body.content_type
 
-    # Add binary image data
-    body_bytes += image_file
-    body_bytes += f"\r\n--{boundary}--\r\n".encode("utf-8")
-    logger.info(f"Image XML headers {headers}")
-    # logger.info(f"Image XML {body_bytes}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Image XML headers %s", headers)
     try:
-        logger.info(f"Uploading image {filename} to eBay...")
-        response = requests.post(url, headers=headers, data=body_bytes)
+        logger.info("Uploading image %s to eBay...", filename)
+        response = _SESSION.post(url, headers=headers, data=body)
         response.raise_for_status()
 
-        xml_string = response.text
-        logger.info(f"Received UploadSiteHostedPictures response: {xml_string}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Received UploadSiteHostedPictures response: %s", response.text
+            )
 
-        root = ET.fromstring(xml_string)
-        ns = {"ebay": "urn:ebay:apis:eBLBaseComponents"}
+        root = ET.fromstring(response.content)
 
         # Check for eBay API errors
-        ack = root.find(".//ebay:Ack", ns)
-        if ack is not None and ack.text != "Success":
-            errors = root.findall(".//ebay:Errors", ns)
-            error_data = []
-            for error in errors:
-                short_message_elem = error.find(".//ebay:ShortMessage", ns)
-                long_message_elem = error.find(".//ebay:LongMessage", ns)
-                error_code_elem = error.find(".//ebay:ErrorCode", ns)
-                severity_elem = error.find(".//ebay:SeverityCode", ns)
-                classification_elem = error.find(
-                    ".//ebay:ErrorClassification", ns
-                )
-
-                error_info = {
-                    "short_message": (
-                        short_message_elem.text
-                        if short_message_elem is not None
-                        else "Unknown error"
-                    ),
-                    "long_message": (
-                        long_message_elem.text
-                        if long_message_elem is not None
-                        else "No details available"
-                    ),
-                    "error_code": (
-                        error_code_elem.text
-                        if error_code_elem is not None
-                        else "N/A"
-                    ),
-                    "severity": (
-                        severity_elem.text
-                        if severity_elem is not None
-                        else "Unknown"
-                    ),
-                    "classification": (
-                        classification_elem.text
-                        if classification_elem is not None
-                        else "Unknown"
-                    ),
-                }
-                error_data.append(error_info)
+        ack = _get_ack(root)
+        if ack is not None and ack != "Success":
+            error_data = _extract_errors(root)
 
             return None, {"type": "structured", "errors": error_data}
 
         # Extract the FullURL from successful response
-        picture_details = root.find(".//ebay:SiteHostedPictureDetails", ns)
+        picture_details = root.find("ebay:SiteHostedPictureDetails", NS)
         if picture_details is not None:
-            full_url_elem = picture_details.find(".//ebay:FullURL", ns)
+            full_url_elem = picture_details.find("ebay:FullURL", NS)
             if full_url_elem is not None:
                 return full_url_elem.text, None
 
@@ -415,6 +548,96 @@ def upload_site_hosted_pictures(image_file, filename):
         return None, {"type": "structured", "errors": error_data}
 
 
+# Static part of every AddItemRequest; built once and deep-copied per listing so
+# only the title, description, item specifics and pictures are filled in per call
+_ADD_ITEM_TEMPLATE = _E.AddItemRequest(
+    _E.ErrorLanguage("en_US"),
+    _E.WarningLevel("High"),
+    _E.Item(
+        _E.Title(),
+        _E.Description(),
+        _E.StartPrice("2.00", currencyID="USD"),
+        _E.CategoryMappingAllowed("true"),
+        _E.PrimaryCategory(_E.CategoryID("261328")),
+        _E.Quantity("1"),
+        _E.ListingType("FixedPriceItem"),
+        _E.ListingDuration("GTC"),
+        _E.Location("Atlanta, GA"),
+        _E.PostalCode("30318"),
+        _E.Country("US"),
+        _E.Currency("USD"),
+        _E.ShippingDetails(
+            _E.ShippingServiceOptions(
+                _E.ShippingService("US_eBayStandardEnvelope"),
+                _E.ShippingServiceCost("1.25", currencyID="USD"),
+                _E.ShippingServicePriority("1"),
+            ),
+            _E.ShippingType("Flat"),
+        ),
+        _E.ShippingPackageDetails(
+            _E.PackageDepth("1"),
+            _E.PackageLength("11"),
+            _E.PackageWidth("6"),
+            _E.WeightMajor("0"),
+            _E.WeightMinor("1"),
+        ),
+        _E.ReturnPolicy(
+            _E.ReturnsAcceptedOption("ReturnsNotAccepted"),
+            _E.ReturnsAccepted("No returns accepted"),
+            _E.InternationalReturnsAcceptedOption("ReturnsNotAccepted"),
+        ),
+        _E.DispatchTimeMax("2"),
+        _E.ConditionID("4000"),
+        _E.ConditionDescriptors(
+            _E.ConditionDescriptor(
+                _E.Name("40001"),
+                _E.Value("400010"),
+            ),
+        ),
+    ),
+)
+
+
+def _build_add_item_request(
+    title: str, description: str, item_specifics_xml: str, picture_urls: list
+) -> bytes:
+    """
+    Builds the serialized AddItemRequest document.
+
+    Text values are escaped by lxml, so titles containing &, < or > can't
+    break the request.
+    """
+    root = copy.deepcopy(_ADD_ITEM_TEMPLATE)
+    item = root.find(_ITEM_TAG)
+    description_element = item.find(_DESCRIPTION_TAG)
+
+    item.find(_TITLE_TAG).text = title
+    if "]]>" in description:
+        # Can't be wrapped in CDATA; plain (escaped) text is equivalent
+        description_element.text = description
+    else:
+        description_element.text = ET.CDATA(f" {description} ")
+
+    if item_specifics_xml.strip():
+        # get_item_details hands back ItemSpecifics without its namespace;
+        # parse it inside a namespaced wrapper so it lands in the eBay namespace
+        wrapper = ET.fromstring(
+            f'<Wrapper xmlns="{NS["ebay"]}">{item_specifics_xml}</Wrapper>'
+        )
+        item.extend(wrapper)
+
+    if picture_urls:
+        item.append(
+            _E.PictureDetails(
+                *[_E.PictureURL(picture_url) for picture_url in picture_urls]
+            )
+        )
+
+    return ET.tostring(
+        root, xml_declaration=True, encoding="utf-8", pretty_print=True
+    )
+
+
 def add_new_item(
     title: str,
     description: str,
@@ -427,126 +650,42 @@ def add_new_item(
     url = EBAY_TRADING_API_URL
     headers = _get_trading_api_headers("AddItem")  # Use OAuth2 headers
 
-    # Build picture details XML if picture URLs are provided
-    picture_details_xml = ""
-    if picture_urls is None:
-        picture_urls = []
-    if picture_urls:
-        picture_urls_xml = ""
-        for picture_url in picture_urls:
-            picture_urls_xml += (
-                f"      <PictureURL>{picture_url}</PictureURL>\n"
-            )
-
-        picture_details_xml = f"""    <PictureDetails>
-{picture_urls_xml}    </PictureDetails>"""
-
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-<AddItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
-  <ErrorLanguage>en_US</ErrorLanguage>
-  <WarningLevel>High</WarningLevel>
-  <Item>
-    <Title>{title}</Title>
-    <Description><![CDATA[ {description} ]]></Description>
-    <StartPrice currencyID="USD">2.00</StartPrice>
-    <CategoryMappingAllowed>true</CategoryMappingAllowed>
-    <PrimaryCategory>
-        <CategoryID>261328</CategoryID>
-    </PrimaryCategory>
-    <Quantity>1</Quantity>
-    <ListingType>FixedPriceItem</ListingType>
-    <ListingDuration>GTC</ListingDuration>
-    <Location>Atlanta, GA</Location>
-    <PostalCode>30318</PostalCode>
-    <Country>US</Country>
-    <Currency>USD</Currency>
-    <ShippingDetails>
-      <ShippingServiceOptions>
-        <ShippingService>US_eBayStandardEnvelope</ShippingService>
-        <ShippingServiceCost currencyID="USD">1.25</ShippingServiceCost>
-        <ShippingServicePriority>1</ShippingServicePriority>
-      </ShippingServiceOptions>
-      <ShippingType>Flat</ShippingType>
-    </ShippingDetails>
-    <ShippingPackageDetails>
-        <PackageDepth>1</PackageDepth>
-        <PackageLength>11</PackageLength>
-        <PackageWidth>6</PackageWidth>
-        <WeightMajor>0</WeightMajor>
-        <WeightMinor>1</WeightMinor>
-    </ShippingPackageDetails>
-    <ReturnPolicy>
-      <ReturnsAcceptedOption>ReturnsNotAccepted</ReturnsAcceptedOption>
-      <ReturnsAccepted>No returns accepted</ReturnsAccepted>
-      <InternationalReturnsAcceptedOption>ReturnsNotAccepted</InternationalReturnsAcceptedOption>
-    </ReturnPolicy>
-    <DispatchTimeMax>2</DispatchTimeMax>
-    <ConditionID>4000</ConditionID>
-    <ConditionDescriptors>
-      <ConditionDescriptor>
-        <Name>40001</Name>
-        <Value>400010</Value>
-      </ConditionDescriptor>
-    </ConditionDescriptors>
-    {item_specifics_xml}
-    {picture_details_xml}
-  </Item>
-</AddItemRequest>"""
-
     try:
-        logger.info(f"Sending AddItemRequest request to eBay API...\n{body}")
-        response = requests.post(
-            url, headers=headers, data=body.encode("utf-8")
+        body = _build_add_item_request(
+            title, description, item_specifics_xml, picture_urls or []
         )
+    except (ET.XMLSyntaxError, ValueError) as e:
+        # Malformed item specifics, or text lxml refuses (control characters)
+        error_data = [
+            {
+                "short_message": "Invalid Listing Data",
+                "long_message": f"Failed to build the AddItem request: {str(e)}",
+                "error_code": "REQUEST_BUILD_ERROR",
+                "severity": "Error",
+                "classification": "RequestError",
+            }
+        ]
+        return None, None, {"type": "structured", "errors": error_data}
+
+    try:
+        logger.info("Sending AddItemRequest request to eBay API...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("AddItemRequest body:\n%s", body.decode("utf-8"))
+        response = _SESSION.post(url, headers=headers, data=body)
         response.raise_for_status()  # Raise an exception for bad status codes
-        xml_string = response.text
-        logger.info(
-            f"Received AddItemRequest response from eBay API: \n{xml_string}"
-        )
-        root = ET.fromstring(xml_string)
-        ns = {"ebay": "urn:ebay:apis:eBLBaseComponents"}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Received AddItemRequest response from eBay API: \n%s",
+                response.text,
+            )
+        root = ET.fromstring(response.content)
 
         # Check for eBay API errors and warnings
-        ack = root.find(".//ebay:Ack", ns)
-        errors = root.findall(".//ebay:Errors", ns)
+        ack = _get_ack(root)
         error_data = []
         warning_data = []
 
-        for error in errors:
-            short_message_elem = error.find(".//ebay:ShortMessage", ns)
-            long_message_elem = error.find(".//ebay:LongMessage", ns)
-            error_code_elem = error.find(".//ebay:ErrorCode", ns)
-            severity_elem = error.find(".//ebay:SeverityCode", ns)
-            classification_elem = error.find(".//ebay:ErrorClassification", ns)
-
-            error_info = {
-                "short_message": (
-                    short_message_elem.text
-                    if short_message_elem is not None
-                    else "Unknown error"
-                ),
-                "long_message": (
-                    long_message_elem.text
-                    if long_message_elem is not None
-                    else "No details available"
-                ),
-                "error_code": (
-                    error_code_elem.text
-                    if error_code_elem is not None
-                    else "N/A"
-                ),
-                "severity": (
-                    severity_elem.text
-                    if severity_elem is not None
-                    else "Unknown"
-                ),
-                "classification": (
-                    classification_elem.text
-                    if classification_elem is not None
-                    else "Unknown"
-                ),
-            }
-
+        for error_info in _extract_errors(root):
             # Separate errors from warnings
             if error_info["severity"] == "Warning":
                 warning_data.append(error_info)
@@ -554,22 +693,22 @@ def add_new_item(
                 error_data.append(error_info)
 
         # If there are actual errors (not just warnings), return error
-        if ack is not None and ack.text == "Failure":
+        if ack == "Failure":
             return None, None, {"type": "structured", "errors": error_data}
 
         # Extract new item ID and fees (success or warning case)
-        item_id_element = root.find(".//ebay:ItemID", ns)
-        fees_element = root.find(".//ebay:Fees", ns)
+        item_id_element = root.find("ebay:ItemID", NS)
+        fees_element = root.find("ebay:Fees", NS)
 
         new_item_id = (
             item_id_element.text if item_id_element is not None else "N/A"
         )
         fees_data = []
         if fees_element is not None:
-            for fee in fees_element.findall(".//ebay:Fee", ns):
-                name_element = fee.find(".//ebay:Name", ns)
+            for fee in fees_element.findall("ebay:Fee", NS):
+                name_element = fee.find("ebay:Name", NS)
                 fee_value_element = fee.find(
-                    ".//ebay:Fee", ns
+                    "ebay:Fee", NS
                 )  # The fee value element is also named "Fee"
                 if name_element is not None and fee_value_element is not None:
                     fees_data.append(
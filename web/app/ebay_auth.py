@@ -1,10 +1,12 @@
 import os
+import gzip
+import threading
 import time
 import requests
 from dotenv import load_dotenv
 import base64
 import json
-from urllib.parse import quote
+from urllib.parse import quote, urlencode
 from .logger import setup_logger
 from config import settings
 
@@ -17,18 +19,112 @@ CLIENT_ID = os.getenv("EBAY_CLIENT_ID")
 CLIENT_SECRET = os.getenv("EBAY_CLIENT_SECRET")
 
 TOKEN_URL = "https://api.ebay.com/identity/v1/oauth2/token"
-USER_OAUTH_TOKEN_FILE = "config/ebay_oauth_token.json"
+AUTH_URL = "https://auth.ebay.com/oauth2/authorize"
+USER_OAUTH_TOKEN_FILE = os.getenv("TOKEN_CACHE_PATH", "config/ebay_oauth_token.json")
+
+# Token stores ending in .gz are read and written gzip-compressed
+_open = gzip.open if USER_OAUTH_TOKEN_FILE.endswith(".gz") else open
+
+# Required scopes for selling operations
+SCOPES = [
+    "https://api.ebay.com/oauth/api_scope",
+    "https://api.ebay.com/oauth/api_scope/sell.marketing.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.marketing",
+    "https://api.ebay.com/oauth/api_scope/sell.inventory.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.inventory",
+    "https://api.ebay.com/oauth/api_scope/sell.account.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.account",
+    "https://api.ebay.com/oauth/api_scope/sell.fulfillment.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.fulfillment",
+    "https://api.ebay.com/oauth/api_scope/sell.analytics.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.finances",
+    "https://api.ebay.com/oauth/api_scope/sell.payment.dispute",
+    "https://api.ebay.com/oauth/api_scope/commerce.identity.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.reputation",
+    "https://api.ebay.com/oauth/api_scope/sell.reputation.readonly",
+    "https://api.ebay.com/oauth/api_scope/commerce.notification.subscription",
+    "https://api.ebay.com/oauth/api_scope/commerce.notification.subscription.readonly",
+    "https://api.ebay.com/oauth/api_scope/sell.stores",
+    "https://api.ebay.com/oauth/api_scope/sell.stores.readonly",
+    "https://api.ebay.com/oauth/scope/sell.edelivery",
+]
+
+# The scopes and client id never change at runtime, so encode them once
+# (generate_oauth_authorization_url refuses to run without a client id)
+_SCOPES_ENCODED = quote(" ".join(SCOPES))
+_STATIC_PARAM_PREFIX = (
+    f"client_id={quote(CLIENT_ID or '')}&response_type=code&scope={_SCOPES_ENCODED}"
+)
 
 
+def _encode_credentials():
+
+    credentials = f"{CLIENT_ID}:{CLIENT_SECRET}"
+    return base64.b64encode(credentials.encode()).decode()
+
+
+# Headers for the OAuth token endpoint only depend on the client credentials
+_TOKEN_HEADERS = {
+    "Content-Type": "application/x-www-form-urlencoded",
+    "Authorization": "Basic " + _encode_credentials(),
+}
+
 _token_cache = {"access_token": None, "expires_at": 0}
+_TOKEN_LOCK = threading.Lock()
+
+# User tokens are considered expired this many seconds before EXPIRES_AT
+USER_TOKEN_EXPIRY_BUFFER = 300
+
+# In-process copy of the user token; expires_at is on the time.monotonic() clock
+_user_token_cache = {"access_token": None, "expires_at": 0}
+_USER_TOKEN_LOCK = threading.Lock()
 
-"""
-Get an eBay application level access token using client credentials.
-"""
 
 def get_ebay_user_token():
     """
-    Get a valid eBay user token, handling refresh and validation.
+    Get a valid eBay user token, served from memory until it nears expiry.
+
+    The token file is only read (and the token only refreshed) when the
+    cached token is missing or about to expire. The reload happens under a
+    lock so concurrent callers trigger at most one refresh.
+
+    Returns:
+        str: A valid AUTH_TOKEN
+
+    Raises:
+        Exception: If AUTH_TOKEN is empty, refresh fails, or token file issues
+    """
+    if _is_user_token_cached():
+        return _user_token_cache["access_token"]
+
+    with _USER_TOKEN_LOCK:
+        # Another thread may have reloaded the token while we waited
+        if _is_user_token_cached():
+            return _user_token_cache["access_token"]
+
+        auth_token, expires_at = _load_valid_user_token()
+
+        remaining = expires_at - USER_TOKEN_EXPIRY_BUFFER - time.time()
+        _user_token_cache["access_token"] = auth_token
+        _user_token_cache["expires_at"] = time.monotonic() + remaining
+        return auth_token
+
+
+def _is_user_token_cached():
+    return (
+        _user_token_cache["access_token"]
+        and time.monotonic() < _user_token_cache["expires_at"]
+    )
+
+
+def _invalidate_user_token_cache():
+    _user_token_cache["access_token"] = None
+    _user_token_cache["expires_at"] = 0
+
+
+def _load_valid_user_token():
+    """
+    Get a valid eBay user token from the token file, handling refresh and validation.
 
     This function:
     1. Checks if AUTH_TOKEN is empty - raises exception if so
@@ -38,7 +134,7 @@ def get_ebay_user_token():
     5. Updates the token file with new tokens when refreshed
 
     Returns:
-        str: A valid AUTH_TOKEN
+        tuple: (AUTH_TOKEN, EXPIRES_AT) for a valid token
 
     Raises:
         Exception: If AUTH_TOKEN is empty, refresh fails, or token file issues
@@ -80,18 +176,18 @@ def get_ebay_user_token():
             # Save updated tokens
             _save_token_data(token_data)
 
-            logger.info(f"Successfully refreshed AUTH_TOKEN (expires at {expires_at})")
-            return new_auth_token
+            logger.info("Successfully refreshed AUTH_TOKEN (expires at %s)", expires_at)
+            return new_auth_token, expires_at
 
         except Exception as e:
-            logger.error(f"Failed to refresh token: {e}")
+            logger.error("Failed to refresh token: %s", e)
             raise Exception(
                 f"Failed to refresh expired AUTH_TOKEN: {e}. "
                 "Please re-authenticate through eBay's OAuth flow."
             )
 
     # Token is valid, return it
-    return auth_token
+    return auth_token, token_data["EXPIRES_AT"]
 
 
 def _load_user_token_data():
@@ -105,7 +201,7 @@ def _load_user_token_data():
         Exception: If file not found or contains invalid JSON
     """
     try:
-        with open(USER_OAUTH_TOKEN_FILE, 'r') as f:
+        with _open(USER_OAUTH_TOKEN_FILE, 'rt') as f:
             token_data = json.load(f)
 
         # Migrate existing token file if it doesn't have EXPIRES_AT
@@ -134,10 +230,13 @@ def _save_token_data(token_data):
         Exception: If file cannot be written
     """
     try:
-        with open(USER_OAUTH_TOKEN_FILE, 'w') as f:
+        # Write to a temp file first so a crash never leaves a truncated token file
+        tmp_path = f"{USER_OAUTH_TOKEN_FILE}.tmp"
+        with _open(tmp_path, 'wt') as f:
             json.dump(token_data, f, indent=2)
+        os.replace(tmp_path, USER_OAUTH_TOKEN_FILE)
     except Exception as e:
-        logger.error(f"Failed to save token data: {e}")
+        logger.error("Failed to save token data: %s", e)
         raise Exception(f"Failed to save updated tokens to {USER_OAUTH_TOKEN_FILE}: {e}")
 
 
@@ -165,15 +264,18 @@ def _is_user_token_expired(auth_token):
 
         current_time = int(time.time())
         # Consider expired if expiring within 5 minutes (300 seconds)
-        buffer_time = 300
-
-        is_expired = current_time >= (expires_at - buffer_time)
-        logger.info(f"Token expires at {expires_at}, current time {current_time}, expired: {is_expired}")
+        is_expired = current_time >= (expires_at - USER_TOKEN_EXPIRY_BUFFER)
+        logger.info(
+            "Token expires at %s, current time %s, expired: %s",
+            expires_at,
+            current_time,
+            is_expired,
+        )
 
         return is_expired
 
     except Exception as e:
-        logger.warning(f"Error checking token expiration: {e}")
+        logger.warning("Error checking token expiration: %s", e)
         # If we can't determine expiration, consider it expired to force refresh
         return True
 
@@ -191,17 +293,12 @@ def _refresh_user_token(refresh_token):
     Raises:
         Exception: If refresh request fails or no access_token received
     """
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Authorization": "Basic " + _encode_credentials(),
-    }
-
     data = {
         "grant_type": "refresh_token",
         "refresh_token": refresh_token,
     }
 
-    response = requests.post(TOKEN_URL, headers=headers, data=data)
+    response = requests.post(TOKEN_URL, headers=_TOKEN_HEADERS, data=data)
 
     if response.status_code != 200:
         raise Exception(f"Token refresh failed with status {response.status_code}: {response.text}")
@@ -235,47 +332,22 @@ def generate_oauth_authorization_url(redirect_uri, state=None):
 
     Returns:
         str: Authorization URL that user should visit to grant permissions
+
+    Raises:
+        Exception: If EBAY_CLIENT_ID is not configured
     """
-    base_url = "https://auth.ebay.com/oauth2/authorize"
-
-    # Required scopes for selling operations
-    scopes = [
-        "https://api.ebay.com/oauth/api_scope",
-        "https://api.ebay.com/oauth/api_scope/sell.marketing.readonly",
-        "https://api.ebay.com/oauth/api_scope/sell.marketing",
-        "https://api.ebay.com/oauth/api_scope/sell.inventory.readonly",
-        "https://api.ebay.com/oauth/api_scope/sell.inventory",
-        "https://api.ebay.com/oauth/api_scope/sell.account.readonly",
-        "https://api.ebay.com/oauth/api_scope/sell.account",
-        "https://api.ebay.com/oauth/api_scope/sell.fulfillment.readonly",
-        "https://api.ebay.com/oauth/api_scope/sell.fulfillment",
-        "https://api.ebay.com/oauth/api_scope/sell.analytics.readonly",
-        "https://api.ebay.com/oauth/api_scope/sell.finances",
-        "https://api.ebay.com/oauth/api_scope/sell.payment.dispute",
-        "https://api.ebay.com/oauth/api_scope/commerce.identity.readonly",
-        "https://api.ebay.com/oauth/api_scope/sell.reputation",
-        "https://api.ebay.com/oauth/api_scope/sell.reputation.readonly",
-        "https://api.ebay.com/oauth/api_scope/commerce.notification.subscription",
-        "https://api.ebay.com/oauth/api_scope/commerce.notification.subscription.readonly",
-        "https://api.ebay.com/oauth/api_scope/sell.stores",
-        "https://api.ebay.com/oauth/api_scope/sell.stores.readonly",
-        "https://api.ebay.com/oauth/scope/sell.edelivery"
-
-    ]
-
-    params = {
-        "client_id": CLIENT_ID,
-        "response_type": "code",
-        "redirect_uri": redirect_uri,
-        "scope": " ".join(scopes),
-    }
+    if not CLIENT_ID:
+        raise Exception(
+            "EBAY_CLIENT_ID is not set; cannot build the eBay authorization URL."
+        )
+
+    params = {"redirect_uri": redirect_uri}
 
     if state:
         params["state"] = state
 
-    # Build URL
-    param_string = "&".join([f"{k}={quote(str(v))}" for k, v in params.items()])
-    auth_url = f"{base_url}?{param_string}"
+    # Only the per-call parameters need encoding; the rest is precomputed
+    auth_url = f"{AUTH_URL}?{_STATIC_PARAM_PREFIX}&{urlencode(params, quote_via=quote)}"
 
     return auth_url
 
@@ -298,18 +370,13 @@ def exchange_code_for_tokens(authorization_code, redirect_uri):
     Raises:
         Exception: If token exchange fails or tokens are not received
     """
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Authorization": "Basic " + _encode_credentials(),
-    }
-
     data = {
         "grant_type": "authorization_code",
         "code": authorization_code,
         "redirect_uri": redirect_uri,
     }
 
-    response = requests.post(TOKEN_URL, headers=headers, data=data)
+    response = requests.post(TOKEN_URL, headers=_TOKEN_HEADERS, data=data)
 
     if response.status_code != 200:
         raise Exception(f"Token exchange failed with status {response.status_code}: {response.text}")
@@ -333,8 +400,9 @@ def exchange_code_for_tokens(authorization_code, redirect_uri):
         "EXPIRES_AT": expires_at
     }
     _save_token_data(token_data)
+    _invalidate_user_token_cache()
 
-    logger.info(f"Successfully obtained and saved new tokens (expires at {expires_at})")
+    logger.info("Successfully obtained and saved new tokens (expires at %s)", expires_at)
 
     return {
         "access_token": access_token,
@@ -370,50 +438,54 @@ except Exception as e:
 """
 
 def get_ebay_token(user: bool = False):
-    current_time = time.time()
-    if (
-        _token_cache["access_token"]
-        and _token_cache["expires_at"] is not None
-        and current_time < _token_cache["expires_at"]
-    ):
-        return _token_cache["access_token"]
-
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Authorization": "Basic " + _encode_credentials(),
-    }
-
-    # scopes = "https://api.ebay.com/oauth/api_scope/sell.fulfillment https://api.ebay.com/oauth/api_scope/sell.fulfillment.readonly"
-    scopes = "https://api.ebay.com/oauth/api_scope"
-
-    data = {
-        "grant_type": "client_credentials",
-        "scope": scopes,
-    }
-
-    response = requests.post(TOKEN_URL, headers=headers, data=data)
-    response.raise_for_status()
-    result = response.json()
-    logger.info("result...", result)
-    # pprint.pprint(result)
+    """
+    Get an eBay application level access token using client credentials.
 
-    _token_cache["access_token"] = result["access_token"]
-    _token_cache["expires_at"] = (
-        current_time + result["expires_in"] - 60
-    )  # buffer of 60 seconds
-    print(f"eBay scopes: {result.get("scope", "")}")
-    # Check if the token has the required scopes
-    # if scopes not in result.get("scope", ""):
-    #     raise Exception(
-    #         f"The eBay token does not have the required scopes ({scopes}). "
-    #         f"The granted scopes are: {result.get('scope', '')}. "
-    #         "Please update the application's OAuth configuration to include these scopes."
-    #     )
+    The token is cached in-process until shortly before it expires. The cache
+    check and the token request happen under a lock so concurrent callers
+    don't all hit the token endpoint when the cached token runs out.
+    """
+    if _is_app_token_valid():
+        return _token_cache["access_token"]
 
-    return _token_cache["access_token"]
+    with _TOKEN_LOCK:
+        # Another thread may have refreshed the token while we waited
+        if _is_app_token_valid():
+            return _token_cache["access_token"]
+
+        # scopes = "https://api.ebay.com/oauth/api_scope/sell.fulfillment https://api.ebay.com/oauth/api_scope/sell.fulfillment.readonly"
+        scopes = "https://api.ebay.com/oauth/api_scope"
+
+        data = {
+            "grant_type": "client_credentials",
+            "scope": scopes,
+        }
+
+        current_time = time.time()
+        response = requests.post(TOKEN_URL, headers=_TOKEN_HEADERS, data=data)
+        response.raise_for_status()
+        result = response.json()
+        logger.debug("token result: %s", result)
+
+        _token_cache["access_token"] = result["access_token"]
+        _token_cache["expires_at"] = (
+            current_time + result["expires_in"] - 60
+        )  # buffer of 60 seconds
+        logger.debug("eBay scopes: %s", result.get("scope", ""))
+        # Check if the token has the required scopes
+        # if scopes not in result.get("scope", ""):
+        #     raise Exception(
+        #         f"The eBay token does not have the required scopes ({scopes}). "
+        #         f"The granted scopes are: {result.get('scope', '')}. "
+        #         "Please update the application's OAuth configuration to include these scopes."
+        #     )
 
+        return _token_cache["access_token"]
 
-def _encode_credentials():
 
-    credentials = f"{CLIENT_ID}:{CLIENT_SECRET}"
-    return base64.b64encode(credentials.encode()).decode()
+def _is_app_token_valid():
+    return (
+        _token_cache["access_token"]
+        and _token_cache["expires_at"] is not None
+        and time.time() < _token_cache["expires_at"]
+    )
@@ -1,90 +1,171 @@
+import asyncio
+import threading
+from functools import lru_cache
+
 from fastapi import HTTPException
 import gspread
-from google.oauth2.service_account import Credentials
 
 from .logger import setup_logger
 
 logger = setup_logger()
 
+# Google Sheets API configuration
+# Replace with your actual credentials file path
+CREDENTIALS_PATH = "web/app/credentials.json"
+# Replace with your actual spreadsheet ID
+SPREADSHEET_ID = "1RQENLNjh4ULFAwGkyjIpibnZASaIqEkpCyLBVVWdGkA"
+SHEET_NAME = "Sheet1"
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+
+def _order_to_row(order: dict) -> list:
+    """
+    Builds the Google Sheets row for an eBay order.
+    """
+    # Extract the required data from the order
+    order_id = order.get("orderId", "")
+
+    # Extract lastModifiedDate from paymentSummary
+    payment_summary = order.get("paymentSummary", {})
+    payments = payment_summary.get("payments", [])
+    sale_date = payments[0].get("paymentDate", "") if payments else ""
+
+    # One pass over the line items for titles, item totals and shipping
+    titles = []
+    sold = 0.0
+    shipping = 0.0
+    for item in order.get("lineItems", []):
+        titles.append(item.get("title", ""))
+        sold += float((item.get("lineItemCost") or {}).get("value", 0))
+        shipping_cost = (item.get("deliveryCost") or {}).get("shippingCost")
+        if shipping_cost:
+            shipping += float(shipping_cost.get("value", 0))
+    desc = "\n".join(titles)
+    total_marketplace_fee = order.get("totalMarketplaceFee", {}).get(
+        "value", 0
+    )
+
+    # Prepare the data for Google Sheets
+    return [
+        sale_date,  # A
+        order_id,  # B
+        desc,  # C
+        "",  # D (empty)
+        "",  # E (empty)
+        sold,  # F
+        shipping,  # G
+        "",  # H (empty)
+        "",  # I (empty)
+        total_marketplace_fee,  # J
+    ]
+
+
+_WORKSHEET_LOCK = threading.Lock()
+
+
+def _get_worksheet():
+    """
+    Returns the target worksheet, authenticating and opening it only once.
+    """
+    # lru_cache alone would let concurrent first calls all do the setup
+    with _WORKSHEET_LOCK:
+        return _open_worksheet()
+
+
+@lru_cache(maxsize=1)
+def _get_client():
+    # The authorized client refreshes its own access token, so it can live
+    # for the whole process
+    return gspread.service_account(filename=CREDENTIALS_PATH, scopes=SCOPES)
 
-async def add_order_to_sheets(order: dict):
-    # Google Sheets API configuration
-    # Replace with your actual credentials file path
-    credentials_path = "web/app/credentials.json"
-    # Replace with your actual spreadsheet ID
-    spreadsheet_id = "1RQENLNjh4ULFAwGkyjIpibnZASaIqEkpCyLBVVWdGkA"
-    sheet_name = "Sheet1"
 
+@lru_cache(maxsize=1)
+def _open_worksheet():
+    # Open the spreadsheet and get the worksheet
+    sh = _get_client().open_by_key(SPREADSHEET_ID)
+    return sh.worksheet(SHEET_NAME)
+
+
+def _append_orders(orders: list):
+    worksheet = _get_worksheet()
+
+    rows = [_order_to_row(order) for order in orders]
+
+    # Append all rows in one request; Sheets finds the first empty row
+    # after the existing table itself, so column A doesn't need reading
     try:
-        # Authenticate with Google Sheets API
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ]
-        credentials = Credentials.from_service_account_file(
-            credentials_path, scopes=scopes
+        worksheet.append_rows(
+            rows, value_input_option="USER_ENTERED", table_range="A1"
         )
-        gc = gspread.service_account(filename=credentials_path)
+    except gspread.exceptions.APIError:
+        # The sheet may have been renamed or deleted; reopen it next time
+        _open_worksheet.cache_clear()
+        raise
 
-        # Open the spreadsheet and get the worksheet
-        sh = gc.open_by_key(spreadsheet_id)
 
-        worksheet = sh.worksheet(sheet_name)
+# Concurrent add requests are coalesced into one append_rows call: the writer
+# waits up to SHEETS_FLUSH_LINGER seconds for more orders, up to SHEETS_BATCH_ROWS
+SHEETS_BATCH_ROWS = 500
+SHEETS_FLUSH_LINGER = 0.25
+_order_queue: asyncio.Queue | None = None
 
-        # Extract the required data from the order
-        order_id = order.get("orderId", "")
 
-        # Extract lastModifiedDate from paymentSummary
-        payment_summary = order.get("paymentSummary", {})
-        payments = payment_summary.get("payments", [])
-        sale_date = payments[0].get("paymentDate", "") if payments else ""
+def start_sheets_writer() -> asyncio.Task:
+    """
+    Starts the background task that batches Google Sheets writes.
+    Must be called from the running event loop (the app lifespan).
+    """
+    global _order_queue
+    _order_queue = asyncio.Queue()
+    return asyncio.create_task(_write_queued_orders(_order_queue))
 
-        line_items = order.get("lineItems", [])
-        desc = "\\n".join([item.get("title", "") for item in line_items])
-        sold = sum(
-            float(item.get("lineItemCost", {}).get("value", 0))
-            for item in line_items
-        )
-        shipping = sum(
-            float(
-                item.get("deliveryCost", {})
-                .get("shippingCost", {})
-                .get("value", 0)
-            )
-            for item in line_items
-            if item.get("deliveryCost")
-            and item.get("deliveryCost").get("shippingCost")
-        )
-        total_marketplace_fee = order.get("totalMarketplaceFee", {}).get(
-            "value", 0
-        )
 
-        # Prepare the data for Google Sheets
-        data = [
-            sale_date,  # A
-            order_id,  # B
-            desc,  # C
-            "",  # D (empty)
-            "",  # E (empty)
-            sold,  # F
-            shipping,  # G
-            "",  # H (empty)
-            "",  # I (empty)
-            total_marketplace_fee,  # J
-        ]
-
-        # Find the first empty row based on the sale_date column (column A)
-        sale_dates = worksheet.col_values(1)  # Column A
-        first_empty_row = len(sale_dates) + 1
-
-        # Add the data to the first empty row
-        worksheet.insert_row(data, first_empty_row)
+async def _write_queued_orders(queue: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        rows = len(batch[0][0])
+        deadline = loop.time() + SHEETS_FLUSH_LINGER
+        while rows < SHEETS_BATCH_ROWS:
+            try:
+                item = await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+
+        orders = [order for queued_orders, _ in batch for order in queued_orders]
+        try:
+            await asyncio.to_thread(_append_orders, orders)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+
+async def add_orders_to_sheets(orders: list):
+    try:
+        if _order_queue is None:
+            # No batching writer running; gspread is blocking, so keep it
+            # off the event loop
+            await asyncio.to_thread(_append_orders, orders)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            await _order_queue.put((orders, future))
+            await future
 
         return {"message": "Order added to Google Sheets successfully!"}
 
     except Exception as e:
-        logger.error(f"Google Sheets API error: {e}")
-        logger.info(f"Google Sheets API error: {e}")
+        logger.error("Google Sheets API error: %s", e)
+        logger.info("Google Sheets API error: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to add to Google Sheets: {str(e)}"
         )
@@ -1,19 +1,43 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 from config import settings
 
+_queue_handler = None
+
+
+def _get_queue_handler():
+    """
+    Returns the process-wide QueueHandler. Records are written to the console
+    and log file by a QueueListener thread, so disk I/O stays off the request path.
+    """
+    global _queue_handler
+    if _queue_handler is None:
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
+        ch = logging.StreamHandler()
+        ch.setFormatter(formatter)
+
+        fh = logging.FileHandler(settings.SERVER_LOG_FILE)
+        fh.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, ch, fh)
+        listener.start()
+        atexit.register(listener.stop)
+
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+    return _queue_handler
+
 
 def setup_logger(name: str = "ebay_search"):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-
-    ch = logging.StreamHandler()
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
-
-    fh = logging.FileHandler(settings.SERVER_LOG_FILE)
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
+    # Several modules share a logger name; only attach the handler once
+    handler = _get_queue_handler()
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
 
     return logger
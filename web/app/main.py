@@ -1,10 +1,21 @@
 import os
+import re
+import threading
+import time
+import uuid
+import asyncio
 import hashlib
-import json
-
-from urllib.parse import urlparse
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+
+from urllib.parse import SplitResult, urlsplit
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Response
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from fastapi import Request
@@ -12,14 +23,17 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
 
 import httpx
+import jinja2
 
-from web.app.google_api import add_order_to_sheets
+from web.app.google_api import add_orders_to_sheets, start_sheets_writer
 
 import web.app.ebay_api as ebay_api
 
 from .logger import setup_logger
+from .responses import load_page, page_response
 from analyze_card import analyze_trading_card, OCRResponse
 
 
@@ -28,7 +42,39 @@ from .routers import pubsub, ebay_oauth
 
 logger = setup_logger()
 
-app = FastAPI()
+# Browser-like UA; some image hosts refuse requests without one
+PROXY_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.10 Safari/605.1.1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not type(asyncio.get_running_loop()).__module__.startswith("uvloop"):
+        logger.warning("uvloop is not active; run the app via run_web.py")
+    # One pooled client for the life of the app so proxied fetches reuse
+    # keep-alive connections instead of a fresh TCP + TLS handshake each time
+    # HTTP/2 lets concurrent fetches from one image CDN share a connection
+    app.state.http = httpx.AsyncClient(
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        headers={"User-Agent": PROXY_USER_AGENT},
+        http2=True,
+    )
+    # Keep the image proxy's disk cache bounded across restarts
+    await asyncio.to_thread(_trim_proxy_cache)
+    await asyncio.to_thread(_migrate_legacy_ocr_cache)
+    sheets_writer = start_sheets_writer()
+    app.state.ocr_pool = ThreadPoolExecutor(
+        max_workers=OCR_CONCURRENCY, thread_name_prefix="ocr"
+    )
+    try:
+        yield
+    finally:
+        sheets_writer.cancel()
+        app.state.ocr_pool.shutdown(wait=False, cancel_futures=True)
+        await app.state.http.aclose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,7 +85,6 @@ app.add_middleware(
 
 app.include_router(pubsub.router)
 app.include_router(ebay_oauth.router)
-# app.include_router(ebay.router)
 
 # Create cache directory if it doesn't exist
 os.makedirs("cache", exist_ok=True)
@@ -47,43 +92,94 @@ os.makedirs("cache", exist_ok=True)
 app.mount("/static", StaticFiles(directory="web/static"), name="static")
 
 
+# Uploaded images are read in chunks and rejected once they pass this size
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024  # 20MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def _read_image_upload(
+    file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES, hasher=None
+) -> bytes:
+    """
+    Reads an uploaded image, rejecting non-images and oversized uploads
+    before they are pulled into memory in full. If a hasher is given, it is
+    fed each chunk as it arrives, saving a second pass over the bytes.
+    """
+    chunks = []
+    async for chunk in _iter_image_upload(file, max_bytes):
+        if hasher is not None:
+            hasher.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _iter_image_upload(file: UploadFile, max_bytes: int):
+    """
+    Yields an uploaded image in chunks, raising a 415 for non-images and a
+    413 once the upload passes max_bytes.
+    """
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=415, detail="Upload must be an image")
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_bytes:
+            raise HTTPException(status_code=413, detail="Upload too large")
+        yield chunk
+
+
 @app.post("/api/search-ebay")
 async def search_ebay(imageFile: UploadFile = File(...)):
     try:
-        image_data = await imageFile.read()
-        results = ebay_api.search_ebay_by_image(
-            image_data, str(imageFile.content_type)
+        image_data = await _read_image_upload(imageFile)
+        # The eBay client is blocking; keep it off the event loop
+        results = await asyncio.to_thread(
+            ebay_api.search_ebay_by_image,
+            image_data,
+            str(imageFile.content_type),
         )
-        return JSONResponse(content=results)
+        return ORJSONResponse(content=results)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"eBay search failed: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        logger.error("eBay search failed: %s", e)
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
+
+
+_INDEX_PAGE = load_page("web/static/index.html")
+_EBAY_ORDERS_PAGE = load_page("web/static/ebay-orders.html")
 
 
 @app.get("/")
-async def index():
-    return FileResponse("web/static/index.html")
+async def index(request: Request):
+    return page_response(request, _INDEX_PAGE)
 
 
 @app.get("/ebay-orders")
-async def ebay_orders_page():
-    return FileResponse("web/static/ebay-orders.html")
+async def ebay_orders_page(request: Request):
+    return page_response(request, _EBAY_ORDERS_PAGE)
 
 
 @app.get("/api/ebay-orders")
 async def ebay_orders():
     try:
-        results = ebay_api.get_ebay_orders()
-        return JSONResponse(content=results)
+        # The eBay client is blocking; keep it off the event loop
+        results = await asyncio.to_thread(ebay_api.get_ebay_orders)
+        return ORJSONResponse(content=results)
     except Exception as e:
-        logger.error(f"eBay search failed: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        logger.error("eBay search failed: %s", e)
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
 
 
 @app.post("/api/add-to-sheets")
-async def add_to_sheets(order: dict):
+async def add_to_sheets(order: dict | list[dict]):
+    # Accept a single order or a batch; a batch goes out as one append
+    orders = order if isinstance(order, list) else [order]
     try:
-        return await add_order_to_sheets(order)
+        return await add_orders_to_sheets(orders)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -94,72 +190,445 @@ async def add_to_sheets(order: dict):
 
 
 # Allowed image extensions and content types
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
-ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+ALLOWED_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp", ".gif"})
+ALLOWED_CONTENT_TYPES = frozenset(
+    {"image/jpeg", "image/png", "image/webp", "image/gif"}
+)
 
-# Optional: List of allowed domains (empty means all are allowed)
-ALLOWED_DOMAINS: set[str] = (
-    set()
+# Optional: List of allowed domains, lowercase (empty means all are allowed)
+ALLOWED_DOMAINS: frozenset[str] = (
+    frozenset()
 )  # Example: {'trusted-cdn.com', 'images.example.com'}
 
 
+def _read_cache_file(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# Uploaded/OCR'd images and cache directories known to exist, so hot paths
+# can skip the stat/mkdir syscalls. Only content-addressed images are
+# tracked here (the proxy cache evicts its files, so it isn't); nothing in
+# the app deletes those, so clearing cache/ by hand needs a restart.
+_known_cache_files: set[str] = set()
+_known_cache_dirs: set[str] = set()
+
+
+async def _cache_file_exists(path: str) -> bool:
+    if path in _known_cache_files:
+        return True
+    exists = await asyncio.to_thread(os.path.exists, path)
+    if exists:
+        _known_cache_files.add(path)
+    return exists
+
+
+def _ensure_cache_dir(path: str):
+    directory = os.path.dirname(path)
+    if directory not in _known_cache_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _known_cache_dirs.add(directory)
+
+
+def _write_cache_file(path: str, data: bytes):
+    # Write through a uniquely named temp file so readers never see a
+    # partial file and concurrent writers don't trip over each other
+    _ensure_cache_dir(path)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+MAX_PROXY_IMAGE_BYTES = 5 * 1024 * 1024  # 5MB
+PROXY_CHUNK_SIZE = 64 * 1024
+
+# Proxied images are cached on disk by URL hash: {key} holds the body and
+# {key}.meta its content type, ETag and upstream validators
+PROXY_CACHE_DIR = "cache/proxy"
+os.makedirs(PROXY_CACHE_DIR, exist_ok=True)
+PROXY_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Trimming stops below the cap so a full cache isn't rescanned on every write
+PROXY_CACHE_TRIM_TO = PROXY_CACHE_MAX_BYTES * 9 // 10
+# Cached images are revalidated upstream after the same 24 hours browsers
+# keep them for; stale entries stay cached until then so a still-current
+# image costs a 304 rather than a full refetch
+PROXY_CACHE_TTL = 86400
+PROXY_CACHE_HEADERS = {"Cache-Control": f"public, max-age={PROXY_CACHE_TTL}"}
+
+# Running size of PROXY_CACHE_DIR: grown on every write, recounted by each
+# trim (overwrites are counted twice until then, which only trims early)
+_proxy_cache_bytes = 0
+_PROXY_CACHE_LOCK = threading.Lock()
+
+
+def _media_type(response: httpx.Response) -> str:
+    """
+    Returns a response's media type, without Content-Type parameters.
+    """
+    return response.headers.get("content-type", "").partition(";")[0].strip()
+
+
+@lru_cache(maxsize=4096)
+def _split_url(url: str) -> SplitResult:
+    # Gallery pages request the same image URLs over and over
+    return urlsplit(url)
+
+
+def _proxy_cache_key(url: str) -> str:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _proxy_etag(hasher) -> str:
+    # Derived from the body, so a changed upstream image gets a new ETag
+    return f'"{hasher.hexdigest()}"'
+
+
+def _upstream_validators(upstream: httpx.Response) -> dict:
+    """
+    Returns the upstream ETag and Last-Modified, under their proxy cache
+    metadata names.
+    """
+    validators = {}
+    if "etag" in upstream.headers:
+        validators["upstream_etag"] = upstream.headers["etag"]
+    if "last-modified" in upstream.headers:
+        validators["last_modified"] = upstream.headers["last-modified"]
+    return validators
+
+
+def _upstream_headers(upstream: httpx.Response) -> dict:
+    return {
+        name: upstream.headers[name]
+        for name in ("ETag", "Last-Modified")
+        if name in upstream.headers
+    }
+
+
+def _proxy_headers(meta: dict) -> dict:
+    headers = {**PROXY_CACHE_HEADERS, "ETag": meta["etag"]}
+    if "last_modified" in meta:
+        headers["Last-Modified"] = meta["last_modified"]
+    return headers
+
+
+def _proxy_not_modified(request: Request, meta: dict) -> bool:
+    # Streamed responses carry the upstream ETag and the rest carry the
+    # content hash; both identify the cached body
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match in (meta["etag"], meta.get("upstream_etag"))
+    if_modified_since = request.headers.get("if-modified-since")
+    return if_modified_since is not None and if_modified_since == meta.get(
+        "last_modified"
+    )
+
+
+def _proxy_cached_response(request: Request, meta: dict, body: bytes) -> Response:
+    headers = _proxy_headers(meta)
+    if _proxy_not_modified(request, meta):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=meta["type"], headers=headers)
+
+
+def _read_proxy_cache(key: str) -> tuple[dict, bytes, float] | None:
+    """
+    Returns the cached (metadata, body, expiry time) for a proxied image, or
+    None if the image isn't cached. Expired entries are returned too, for
+    revalidation.
+    """
+    path = os.path.join(PROXY_CACHE_DIR, key)
+    try:
+        with open(f"{path}.meta", "rb") as f:
+            meta = orjson.loads(f.read())
+        if "type" not in meta or "etag" not in meta:
+            return None
+        with open(path, "rb") as f:
+            expires_at = os.fstat(f.fileno()).st_mtime + PROXY_CACHE_TTL
+            return meta, f.read(), expires_at
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
+
+def _touch_proxy_cache(key: str):
+    # Upstream confirmed the entry is current: restart its TTL
+    try:
+        os.utime(os.path.join(PROXY_CACHE_DIR, key))
+    except FileNotFoundError:
+        pass
+
+
+# Recently proxied images are also kept in memory (filled from disk on
+# first use), bounded by both entry count and total size
+PROXY_MEM_CACHE_SIZE = 2048
+PROXY_MEM_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_proxy_mem_cache: OrderedDict[str, tuple[dict, bytes, float]] = OrderedDict()
+_proxy_mem_cache_bytes = 0
+
+
+def _proxy_mem_cache_get(key: str) -> tuple[dict, bytes, float] | None:
+    cached = _proxy_mem_cache.get(key)
+    if cached is not None:
+        _proxy_mem_cache.move_to_end(key)
+    return cached
+
+
+def _proxy_mem_cache_put(key: str, meta: dict, body: bytes, expires_at: float):
+    global _proxy_mem_cache_bytes
+    previous = _proxy_mem_cache.pop(key, None)
+    if previous is not None:
+        _proxy_mem_cache_bytes -= len(previous[1])
+    _proxy_mem_cache[key] = (meta, body, expires_at)
+    _proxy_mem_cache_bytes += len(body)
+    while (
+        len(_proxy_mem_cache) > PROXY_MEM_CACHE_SIZE
+        or _proxy_mem_cache_bytes > PROXY_MEM_CACHE_MAX_BYTES
+    ):
+        _, (_, evicted, _) = _proxy_mem_cache.popitem(last=False)
+        _proxy_mem_cache_bytes -= len(evicted)
+
+
+def _trim_proxy_cache(max_bytes: int = PROXY_CACHE_TRIM_TO):
+    """
+    Evicts the oldest proxied images until the cache fits in max_bytes, and
+    resets the running size to what is left.
+    """
+    global _proxy_cache_bytes
+    with _PROXY_CACHE_LOCK:
+        try:
+            entries = [
+                entry
+                for entry in os.scandir(PROXY_CACHE_DIR)
+                if entry.is_file() and "." not in entry.name
+            ]
+        except FileNotFoundError:
+            _proxy_cache_bytes = 0
+            return
+        stats = [(entry, entry.stat()) for entry in entries]
+        total = sum(st.st_size for _, st in stats)
+        # Oldest writes go first; atime isn't reliable on relatime/noatime
+        # mounts
+        for entry, st in sorted(stats, key=lambda item: item[1].st_mtime):
+            if total <= max_bytes:
+                break
+            for path in (entry.path, f"{entry.path}.meta"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= st.st_size
+        _proxy_cache_bytes = total
+
+
+def _record_proxy_cache_write(size: int):
+    """
+    Adds a newly cached body to the running size, trimming the cache once
+    it passes PROXY_CACHE_MAX_BYTES.
+    """
+    global _proxy_cache_bytes
+    with _PROXY_CACHE_LOCK:
+        _proxy_cache_bytes += size
+        over = _proxy_cache_bytes > PROXY_CACHE_MAX_BYTES
+    if over:
+        _trim_proxy_cache(PROXY_CACHE_TRIM_TO)
+
+
+def _store_proxy_cache(key: str, body: bytes, meta: dict):
+    path = os.path.join(PROXY_CACHE_DIR, key)
+    _write_cache_file(path, body)
+    # The metadata goes last: an entry without it is treated as a miss
+    _write_cache_file(f"{path}.meta", orjson.dumps(meta))
+    _record_proxy_cache_write(len(body))
+
+
+def _finish_proxy_cache(tmp_path: str, key: str, size: int, meta: dict):
+    path = os.path.join(PROXY_CACHE_DIR, key)
+    os.replace(tmp_path, path)
+    _write_cache_file(f"{path}.meta", orjson.dumps(meta))
+    _record_proxy_cache_write(size)
+
+
+async def _capped_stream(
+    upstream: httpx.Response, max_bytes: int, cache_key: str | None = None
+):
+    """
+    Relays an upstream body chunk by chunk, aborting once it passes max_bytes
+    (Content-Length can be missing or wrong). With a cache_key, the body is
+    also saved to the proxy cache once it has been received in full.
+    """
+    cache_file = None
+    if cache_key is not None:
+        cache_path = os.path.join(PROXY_CACHE_DIR, cache_key)
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        cache_file = await asyncio.to_thread(open, tmp_path, "wb")
+        hasher = hashlib.blake2b(digest_size=16)
+
+    try:
+        received = 0
+        async for chunk in upstream.aiter_bytes(chunk_size=PROXY_CHUNK_SIZE):
+            received += len(chunk)
+            if received > max_bytes:
+                raise ValueError("Proxied image exceeded size limit")
+            if cache_file is not None:
+                hasher.update(chunk)
+                await asyncio.to_thread(cache_file.write, chunk)
+            yield chunk
+
+        if cache_file is not None:
+            cache_file.close()
+            cache_file = None
+            meta = {
+                "type": _media_type(upstream),
+                "etag": _proxy_etag(hasher),
+                **_upstream_validators(upstream),
+            }
+            await asyncio.to_thread(
+                _finish_proxy_cache, tmp_path, cache_key, received, meta
+            )
+    finally:
+        # Incomplete download: drop the partial file
+        if cache_file is not None:
+            cache_file.close()
+            os.remove(tmp_path)
+        # The response's background task doesn't run if streaming fails
+        await upstream.aclose()
+
+
+async def _read_capped(upstream: httpx.Response, max_bytes: int) -> bytes:
+    """
+    Reads a whole upstream body, raising a 413 once it passes max_bytes.
+    """
+    body = bytearray()
+    async for chunk in upstream.aiter_bytes(chunk_size=PROXY_CHUNK_SIZE):
+        body += chunk
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail="Image too large")
+    return bytes(body)
+
+
 @app.get("/api/image-proxy")
 async def proxy_image(
-    url: str = Query(..., description="The image URL to proxy")
+    request: Request,
+    url: str = Query(..., description="The image URL to proxy"),
 ):
     try:
         # Validate URL format
-        parsed = urlparse(url)
-        if not all([parsed.scheme, parsed.netloc]):
+        parsed = _split_url(url)
+        if not parsed.scheme or not parsed.netloc:
             raise HTTPException(status_code=400, detail="Invalid URL format")
 
         # Validate domain if allowed domains are specified
-        if ALLOWED_DOMAINS and parsed.netloc not in ALLOWED_DOMAINS:
+        if ALLOWED_DOMAINS and parsed.netloc.lower() not in ALLOWED_DOMAINS:
             raise HTTPException(status_code=403, detail="Domain not allowed")
 
         # # Validate file extension
         # if not any(parsed.path.lower().endswith(ext) for ext in ALLOWED_EXTENSIONS):
         #     raise HTTPException(status_code=400, detail="Invalid image extension")
 
-        # Fetch the image
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.10 Safari/605.1.1"
+        # Serve from the memory or disk cache when possible
+        cache_key = _proxy_cache_key(url)
+        cached = _proxy_mem_cache_get(cache_key)
+        if cached is None:
+            cached = await asyncio.to_thread(_read_proxy_cache, cache_key)
+            if cached is not None:
+                _proxy_mem_cache_put(cache_key, *cached)
+        if cached is not None and cached[2] > time.time():
+            return _proxy_cached_response(request, *cached[:2])
+
+        # A stale copy is revalidated with the validators upstream gave for
+        # it; without one, the client's own conditional headers are passed on
+        if cached is not None:
+            meta = cached[0]
+            conditional = {}
+            if "upstream_etag" in meta:
+                conditional["If-None-Match"] = meta["upstream_etag"]
+            if "last_modified" in meta:
+                conditional["If-Modified-Since"] = meta["last_modified"]
+        else:
+            conditional = {
+                name: request.headers[name]
+                for name in ("if-none-match", "if-modified-since")
+                if name in request.headers
             }
-            response = await client.get(url, headers=headers, timeout=10.0)
+
+        # Fetch the image; only headers are read here, the body is streamed
+        client = request.app.state.http
+        upstream = await client.send(
+            client.build_request("GET", url, headers=conditional), stream=True
+        )
+
+        try:
+            if upstream.status_code == 304:
+                await upstream.aclose()
+                if cached is None:
+                    return Response(
+                        status_code=304,
+                        headers={**PROXY_CACHE_HEADERS, **_upstream_headers(upstream)},
+                    )
+                # Still current upstream: keep serving the cached copy
+                meta, body, _ = cached
+                await asyncio.to_thread(_touch_proxy_cache, cache_key)
+                _proxy_mem_cache_put(
+                    cache_key, meta, body, time.time() + PROXY_CACHE_TTL
+                )
+                return _proxy_cached_response(request, meta, body)
 
             # Check status
-            if response.status_code != 200:
+            if upstream.status_code != 200:
                 raise HTTPException(
-                    status_code=response.status_code, detail="Upstream error"
+                    status_code=upstream.status_code, detail="Upstream error"
                 )
 
             # Validate content type
-            content_type = response.headers.get("content-type", "").split(";")[
-                0
-            ]
+            content_type = _media_type(upstream)
             # if content_type not in ALLOWED_CONTENT_TYPES:
             #     raise HTTPException(
             #         status_code=400, detail=f"Invalid content type - {content_type}"
             #     )
 
             # Validate size (5MB max)
-            if "content-length" in response.headers:
-                content_length = int(response.headers["content-length"])
-                if content_length > 5 * 1024 * 1024:  # 5MB
-                    raise HTTPException(
-                        status_code=400, detail="Image too large"
-                    )
-
-            # Return the image
-            return Response(
-                content=response.content,
-                media_type=content_type,
-                headers={
-                    "Cache-Control": "public, max-age=86400"  # Cache for 24 hours
-                },
-            )
+            if "content-length" in upstream.headers:
+                content_length = int(upstream.headers["content-length"])
+                if content_length > MAX_PROXY_IMAGE_BYTES:
+                    raise HTTPException(status_code=413, detail="Image too large")
+            if (
+                "content-length" not in upstream.headers
+                or "content-encoding" in upstream.headers
+            ):
+                # No trustworthy size (chunked, or a Content-Length counting
+                # compressed bytes): read at most the cap up front so an
+                # oversized image gets a clean 413, not a truncated body
+                body = await _read_capped(upstream, MAX_PROXY_IMAGE_BYTES)
+                meta = {
+                    "type": content_type,
+                    "etag": _proxy_etag(hashlib.blake2b(body, digest_size=16)),
+                    **_upstream_validators(upstream),
+                }
+                await asyncio.to_thread(_store_proxy_cache, cache_key, body, meta)
+                _proxy_mem_cache_put(
+                    cache_key, meta, body, time.time() + PROXY_CACHE_TTL
+                )
+                return Response(
+                    content=body, media_type=content_type, headers=_proxy_headers(meta)
+                )
+        except BaseException:
+            await upstream.aclose()
+            raise
+
+        # Return the image; the content hash is only known once the body has
+        # been streamed, so the upstream validators are passed on instead
+        return StreamingResponse(
+            _capped_stream(upstream, MAX_PROXY_IMAGE_BYTES, cache_key),
+            media_type=content_type,
+            headers={**PROXY_CACHE_HEADERS, **_upstream_headers(upstream)},
+            background=BackgroundTask(upstream.aclose),
+        )
 
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Upstream timeout")
     except httpx.RequestError as e:
@@ -172,152 +641,240 @@ async def proxy_image(
         )
 
 
-def get_file_hash(content: bytes) -> str:
-    return hashlib.md5(content).hexdigest()
+def new_file_hasher():
+    # Only used to key cache files, so a fast hash beats MD5 here
+    return hashlib.blake2b(digest_size=16)
 
 
-@app.post("/api/ocr-image", response_model=OCRResponse)
-async def ocr_image(file: UploadFile = File(...)):
+
+# analyze_trading_card is slow and blocking; it gets its own pool (see
+# lifespan) so OCR can't starve the default pool used for eBay/Sheets calls
+OCR_CONCURRENCY = os.cpu_count() or 4
+
+
+def _cache_path(file_hash: str, ext: str) -> str:
+    # Content-addressed cache for uploads and their OCR results; fan out by
+    # hash prefix (cache/ab/cd/abcd...) so no directory grows huge
+    return f"cache/{file_hash[:2]}/{file_hash[2:4]}/{file_hash}.{ext}"
+
+
+# Uploads used to be cached flat as cache/{md5}.jpg with their OCR result in
+# cache/{md5}.json
+_LEGACY_OCR_IMAGE = re.compile(r"^[0-9a-f]{32}\.jpg$")
+
+
+def _migrate_legacy_ocr_cache():
+    """
+    Moves MD5-keyed upload images and OCR results to their BLAKE2b-keyed,
+    sharded paths, so cached OCR results aren't paid for again. A no-op once
+    nothing is left to move.
+    """
     try:
-        # Read the file content
-        content = await file.read()
+        entries = [
+            entry
+            for entry in os.scandir("cache")
+            if entry.is_file() and _LEGACY_OCR_IMAGE.match(entry.name)
+        ]
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        with open(entry.path, "rb") as f:
+            hasher = new_file_hasher()
+            while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+        file_hash = hasher.hexdigest()
+        legacy_json = f"{entry.path[:-len('.jpg')]}.json"
+        # The result goes first: an image without one just gets OCR'd again
+        for old_path, ext in ((legacy_json, "json"), (entry.path, "jpg")):
+            if not os.path.exists(old_path):
+                continue
+            new_path = _cache_path(file_hash, ext)
+            _ensure_cache_dir(new_path)
+            if os.path.exists(new_path):
+                os.remove(old_path)
+            else:
+                os.replace(old_path, new_path)
+        logger.info("Migrated legacy OCR cache entry %s", entry.name)
 
-        # Generate hash for filename
-        file_hash = get_file_hash(content)
-        img_cache_path = f"cache/{file_hash}.jpg"
 
-        # Check cache
-        img_cache_hit = os.path.exists(img_cache_path)
+# Recently used OCR results, parsed, so hot images skip the disk read and JSON
+# parse; least recently used entries are evicted past OCR_MEM_CACHE_SIZE
+OCR_MEM_CACHE_SIZE = 512
+_ocr_mem_cache: OrderedDict[str, dict] = OrderedDict()
 
-        # Save to cache if not exists
-        if not img_cache_hit:
-            with open(img_cache_path, "wb") as f:
-                f.write(content)
 
-        json_cache_path = f"cache/{file_hash}.json"
-        json_cache_hit = os.path.exists(json_cache_path)
+def _ocr_mem_cache_get(file_hash: str) -> dict | None:
+    parsed = _ocr_mem_cache.get(file_hash)
+    if parsed is not None:
+        _ocr_mem_cache.move_to_end(file_hash)
+    return parsed
 
-        # Save to cache if not exists
-        if json_cache_hit:
-            with open(json_cache_path, "r") as f:
-                ocr_data = f.read()
-            logger.info("OCR data FROM CACHE...")
-        else:
-            # Perform OCR
-            ocr_data = analyze_trading_card(img_cache_path)
-            with open(json_cache_path, "w") as f:
-                f.write(ocr_data)
-            logger.info("CACHED OCR data...")
 
-        logger.info(f"OCR data: {ocr_data}")
-        response = {"status": "ok", "cache_hit": img_cache_hit}
+def _ocr_mem_cache_put(file_hash: str, parsed: dict):
+    _ocr_mem_cache[file_hash] = parsed
+    _ocr_mem_cache.move_to_end(file_hash)
+    if len(_ocr_mem_cache) > OCR_MEM_CACHE_SIZE:
+        _ocr_mem_cache.popitem(last=False)
+
 
-        response.update(json.loads(ocr_data))
+# OCR runs in progress, keyed by image hash
+_inflight_ocr: dict[str, asyncio.Task] = {}
 
-        return response
 
+async def _run_ocr(
+    pool: ThreadPoolExecutor, file_hash: str, content: bytes
+) -> tuple[dict, bool]:
+    """
+    Runs OCR on an uncached image and caches the result.
+    Returns the parsed OCR result and whether the image was already cached.
+    """
+    # Only write the image out when OCR actually has to run on it
+    img_cache_path = _cache_path(file_hash, "jpg")
+    img_cache_hit = await _cache_file_exists(img_cache_path)
+    if not img_cache_hit:
+        await asyncio.to_thread(_write_cache_file, img_cache_path, content)
+        _known_cache_files.add(img_cache_path)
+
+    # Perform OCR in the OCR pool so the event loop keeps serving; the
+    # upload is already in memory, so hand it over rather than re-reading it
+    loop = asyncio.get_running_loop()
+    ocr_data = await loop.run_in_executor(pool, analyze_trading_card, content)
+    logger.info("OCR data: %s", ocr_data)
+
+    # Parse (or serialize) once here so requests sharing this run don't
+    # each repeat it
+    if isinstance(ocr_data, dict):
+        parsed, ocr_json = ocr_data, orjson.dumps(ocr_data)
+    else:
+        ocr_json = ocr_data.encode("utf-8")
+        parsed = orjson.loads(ocr_json)
+    await asyncio.to_thread(
+        _write_cache_file, _cache_path(file_hash, "json"), ocr_json
+    )
+    logger.info("CACHED OCR data...")
+    _ocr_mem_cache_put(file_hash, parsed)
+    return parsed, img_cache_hit
+
+
+@app.post("/api/ocr-image", response_model=OCRResponse)
+async def ocr_image(request: Request, file: UploadFile = File(...)):
+    try:
+        # Read the file content, hashing it as it arrives
+        hasher = new_file_hasher()
+        content = await _read_image_upload(file, hasher=hasher)
+        file_hash = hasher.hexdigest()
+        json_cache_path = _cache_path(file_hash, "json")
+
+        # A cached OCR result is all we need; the image isn't touched on a hit
+        parsed = _ocr_mem_cache_get(file_hash)
+        if parsed is None:
+            ocr_data = await asyncio.to_thread(_read_cache_file, json_cache_path)
+            if ocr_data is not None:
+                parsed = orjson.loads(ocr_data)
+                _ocr_mem_cache_put(file_hash, parsed)
+        if parsed is not None:
+            logger.info("OCR data FROM CACHE...")
+            return {"status": "ok", "cache_hit": True, **parsed}
+
+        # Concurrent uploads of the same image share a single OCR run
+        task = _inflight_ocr.get(file_hash)
+        if task is None:
+            task = asyncio.create_task(
+                _run_ocr(request.app.state.ocr_pool, file_hash, content)
+            )
+            _inflight_ocr[file_hash] = task
+            task.add_done_callback(lambda _: _inflight_ocr.pop(file_hash, None))
+        # shield: one client disconnecting mustn't cancel OCR for the others
+        parsed, img_cache_hit = await asyncio.shield(task)
+
+        return {"status": "ok", "cache_hit": img_cache_hit, **parsed}
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"OCR failed: {e}")
+        logger.error("OCR failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Initialize Jinja2Templates
-templates = Jinja2Templates(directory="web/app/templates")
+# eBay "sell similar" draft editor for a newly created listing
+EDIT_DRAFT_URL_TEMPLATE = (
+    "https://www.ebay.com/sl/list?mode=SellLikeItem&draft_id={draft_id}"
+    "&ReturnURL=https%3A%2F%2Fwww.ebay.com%2Fsh%2Flst%2Fdrafts"
+    "&DraftURL=https%3A%2F%2Fwww.ebay.com%2Fsh%2Flst%2Fdrafts"
+)
+
+# Initialize Jinja2Templates; templates are compiled once per process and
+# their bytecode is cached on disk so restarts skip parsing them again
+JINJA_BYTECODE_CACHE_DIR = "cache/jinja_bc"
+os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+templates = Jinja2Templates(
+    env=jinja2.Environment(
+        loader=jinja2.FileSystemLoader("web/app/templates"),
+        autoescape=jinja2.select_autoescape(["html"]),
+        auto_reload=False,
+        cache_size=400,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR),
+    )
+)
 
+# Context keys the new-item form expects; handlers override what they set
+_NEW_ITEM_FORM_DEFAULTS = MappingProxyType(
+    {
+        "item_id": None,
+        "new_item_id": None,
+        "fees": None,
+        "error": None,
+        "structured_errors": None,
+        "edit_url": None,
+    }
+)
 
-@app.get("/ebay/new-item", response_class=HTMLResponse)
-async def ebay_new_item_get(request: Request, item_id: str = None):
-    """
-    Renders the form to input eBay Item ID or shows results for GET requests.
-    """
-    if item_id is None:
-        return templates.TemplateResponse(
-            "new_item_form.html",
-            {
-                "request": request,
-                "item_id": None,
-                "new_item_id": None,
-                "fees": None,
-                "error": None,
-                "structured_errors": None,
-                "edit_url": None,
-            },
-        )
 
-    title, description, item_specifics_xml, get_item_error = (
-        ebay_api.get_item_details(item_id)
+def _render_new_item_form(request: Request, **context):
+    return templates.TemplateResponse(
+        request,
+        "new_item_form.html",
+        {**_NEW_ITEM_FORM_DEFAULTS, **context},
     )
-    if get_item_error:
-        # Handle both old string format and new structured format
-        if (
-            isinstance(get_item_error, dict)
-            and get_item_error.get("type") == "structured"
-        ):
-            return templates.TemplateResponse(
-                "new_item_form.html",
-                {
-                    "request": request,
-                    "item_id": item_id,
-                    "new_item_id": None,
-                    "fees": None,
-                    "structured_errors": get_item_error["errors"],
-                    "error": None,
-                    "edit_url": None,
-                },
-            )
-        else:
-            return templates.TemplateResponse(
-                "new_item_form.html",
-                {
-                    "request": request,
-                    "item_id": item_id,
-                    "new_item_id": None,
-                    "fees": None,
-                    "error": f"Error fetching item details: {get_item_error}",
-                    "structured_errors": None,
-                    "edit_url": None,
-                },
-            )
 
-    new_item_id, fees, add_item_result = ebay.add_new_item(
-        title or "", description or "", item_specifics_xml or ""
+
+def _error_context(error, message: str) -> dict:
+    """
+    Maps an eBay helper error to form context: structured errors are listed,
+    anything else is shown as a message.
+    """
+    if isinstance(error, dict) and error.get("type") == "structured":
+        return {"structured_errors": error["errors"]}
+    return {"error": f"{message}: {error}"}
+
+
+async def _create_listing(
+    request: Request,
+    item_id: str,
+    title,
+    description,
+    item_specifics_xml,
+    picture_urls: list | None = None,
+):
+    """
+    Lists a copy of an item on eBay and renders the result.
+    """
+    new_item_id, fees, add_item_result = await asyncio.to_thread(
+        ebay_api.add_new_item,
+        title or "",
+        description or "",
+        item_specifics_xml or "",
+        picture_urls,
     )
 
     # Check if it's an actual error (no new_item_id) or just warnings (has new_item_id)
     if add_item_result and not new_item_id:
         # This is an actual error - no listing was created
-        if (
-            isinstance(add_item_result, dict)
-            and add_item_result.get("type") == "structured"
-        ):
-            return templates.TemplateResponse(
-                "new_item_form.html",
-                {
-                    "request": request,
-                    "item_id": item_id,
-                    "new_item_id": None,
-                    "fees": None,
-                    "structured_errors": add_item_result["errors"],
-                    "error": None,
-                    "edit_url": None,
-                },
-            )
-        else:
-            return templates.TemplateResponse(
-                "new_item_form.html",
-                {
-                    "request": request,
-                    "item_id": item_id,
-                    "new_item_id": None,
-                    "fees": None,
-                    "error": f"Error creating new item: {add_item_result}",
-                    "structured_errors": None,
-                    "edit_url": None,
-                },
-            )
-
-    # Construct the edit draft URL
-    edit_url = f"https://www.ebay.com/sl/list?mode=SellLikeItem&draft_id={new_item_id}&ReturnURL=https%3A%2F%2Fwww.ebay.com%2Fsh%2Flst%2Fdrafts&DraftURL=https%3A%2F%2Fwww.ebay.com%2Fsh%2Flst%2Fdrafts"
+        return _render_new_item_form(
+            request,
+            item_id=item_id,
+            **_error_context(add_item_result, "Error creating new item"),
+        )
 
     # If there are warnings (add_item_result contains warnings), include them with the success
     warnings = None
@@ -328,252 +885,197 @@ async def ebay_new_item_get(request: Request, item_id: str = None):
     ):
         warnings = add_item_result["errors"]  # These are actually warnings
 
-    return templates.TemplateResponse(
-        "new_item_form.html",
-        {
-            "request": request,
-            "item_id": item_id,
-            "new_item_id": new_item_id,
-            "fees": fees,
-            "edit_url": edit_url,
-            "error": None,
-            "structured_errors": warnings,
-        },
+    return _render_new_item_form(
+        request,
+        item_id=item_id,
+        new_item_id=new_item_id,
+        fees=fees,
+        edit_url=EDIT_DRAFT_URL_TEMPLATE.format(draft_id=new_item_id),
+        structured_errors=warnings,
     )
 
 
+@app.get("/ebay/new-item", response_class=HTMLResponse)
+async def ebay_new_item_get(request: Request, item_id: str = None):
+    """
+    Renders the form to input eBay Item ID or shows results for GET requests.
+    """
+    if item_id is None:
+        return _render_new_item_form(request)
+
+    title, description, item_specifics_xml, get_item_error = (
+        await asyncio.to_thread(ebay_api.get_item_details, item_id)
+    )
+    if get_item_error:
+        return _render_new_item_form(
+            request,
+            item_id=item_id,
+            **_error_context(get_item_error, "Error fetching item details"),
+        )
+
+    return await _create_listing(
+        request, item_id, title, description, item_specifics_xml
+    )
+
+
+def _store_spooled_upload(tmp_path: str, cache_path: str):
+    if os.path.exists(cache_path):
+        # Same image uploaded before: keep the existing copy
+        os.remove(tmp_path)
+    else:
+        _ensure_cache_dir(cache_path)
+        os.replace(tmp_path, cache_path)
+    _known_cache_files.add(cache_path)
+
+
+async def _spool_image_upload(file: UploadFile, ext: str) -> str:
+    """
+    Streams an uploaded image into the content-addressed cache, hashing it
+    on the way, so only one chunk at a time is held in memory.
+    Returns the cache path.
+    """
+    hasher = new_file_hasher()
+    tmp_path = f"cache/upload-{uuid.uuid4().hex}.tmp"
+    tmp_file = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        async for chunk in _iter_image_upload(file, MAX_UPLOAD_BYTES):
+            hasher.update(chunk)
+            await asyncio.to_thread(tmp_file.write, chunk)
+    except BaseException:
+        tmp_file.close()
+        os.remove(tmp_path)
+        raise
+    tmp_file.close()
+
+    cache_path = _cache_path(hasher.hexdigest(), ext)
+    await asyncio.to_thread(_store_spooled_upload, tmp_path, cache_path)
+    return cache_path
+
+
+def _upload_cached_image(cache_path: str, filename: str):
+    # Opened in the worker thread too, so no file I/O runs on the event loop
+    with open(cache_path, "rb") as image_file:
+        return ebay_api.upload_site_hosted_pictures(image_file, filename)
+
+
+async def _upload_new_item_image(
+    item_id: str, index: int, file: UploadFile
+) -> tuple[str | None, list[dict]]:
+    """
+    Caches one uploaded image and uploads it to eBay.
+    Returns the picture URL, or None and a list of structured errors.
+    """
+    try:
+        ext = os.path.splitext(file.filename)[1].lstrip(".").lower() or "jpg"
+        cache_path = await _spool_image_upload(file, ext)
+        logger.info(
+            "Cached image %s for item %s as %s", index, item_id, cache_path
+        )
+
+        # Upload to eBay, streaming the image from the cached copy
+        picture_url, upload_error = await asyncio.to_thread(
+            _upload_cached_image, cache_path, file.filename
+        )
+
+        if upload_error:
+            if (
+                isinstance(upload_error, dict)
+                and upload_error.get("type") == "structured"
+            ):
+                return None, upload_error["errors"]
+            return None, [
+                {
+                    "short_message": f"Image Upload Failed: {file.filename}",
+                    "long_message": str(upload_error),
+                    "error_code": "IMAGE_UPLOAD_ERROR",
+                    "severity": "Error",
+                    "classification": "RequestError",
+                }
+            ]
+        return picture_url, []
+
+    except Exception as e:
+        return None, [
+            {
+                "short_message": f"Image Processing Failed: {file.filename}",
+                "long_message": f"Failed to process image: {str(e)}",
+                "error_code": "IMAGE_PROCESS_ERROR",
+                "severity": "Error",
+                "classification": "SystemError",
+            }
+        ]
+
+
+# Form fields carrying new-item images, e.g. "image_0"
+_IMAGE_FIELD = re.compile(r"^image_(\d+)$")
+
+
 @app.post("/ebay/new-item", response_class=HTMLResponse)
 async def ebay_new_item_post(request: Request):
     """
     Handles POST requests with image uploads for creating new eBay listings.
     """
-    import os
-    import hashlib
-
     try:
         # Parse form data
         form = await request.form()
         item_id = form.get("item_id")
 
         if not item_id:
-            return templates.TemplateResponse(
-                "new_item_form.html",
-                {
-                    "request": request,
-                    "item_id": None,
-                    "new_item_id": None,
-                    "fees": None,
-                    "error": "Item ID is required",
-                    "structured_errors": None,
-                    "edit_url": None,
-                },
-            )
+            return _render_new_item_form(request, error="Item ID is required")
 
         # Get item details
         title, description, item_specifics_xml, get_item_error = (
-            ebay_api.get_item_details(item_id)
+            await asyncio.to_thread(ebay_api.get_item_details, item_id)
         )
         if get_item_error:
-            # Handle both old string format and new structured format
-            if (
-                isinstance(get_item_error, dict)
-                and get_item_error.get("type") == "structured"
-            ):
-                return templates.TemplateResponse(
-                    "new_item_form.html",
-                    {
-                        "request": request,
-                        "item_id": item_id,
-                        "new_item_id": None,
-                        "fees": None,
-                        "structured_errors": get_item_error["errors"],
-                        "error": None,
-                        "edit_url": None,
-                    },
-                )
-            else:
-                return templates.TemplateResponse(
-                    "new_item_form.html",
-                    {
-                        "request": request,
-                        "item_id": item_id,
-                        "new_item_id": None,
-                        "fees": None,
-                        "error": f"Error fetching item details: {get_item_error}",
-                        "structured_errors": None,
-                        "edit_url": None,
-                    },
-                )
+            return _render_new_item_form(
+                request,
+                item_id=item_id,
+                **_error_context(get_item_error, "Error fetching item details"),
+            )
 
         # Process uploaded images
         picture_urls = []
         upload_errors = []
 
-        # Get all uploaded files and sort by index
-        image_files = []
-        for key, file in form.items():
-            if (
-                key.startswith("image_")
-                and hasattr(file, "filename")
-                and getattr(file, "filename", None)
-            ):
-                try:
-                    index = int(key.split("_")[1])
-                    image_files.append((index, file))
-                except (ValueError, IndexError):
-                    continue
-
-        # Sort by index to maintain order
-        image_files.sort(key=lambda x: x[0])
-
-        # Upload each image to eBay
-        for index, file in image_files:
-            try:
-                # Read file content
-                file_content = await file.read()
-
-                # Save to cache
-                cache_dir = "cache"
-                os.makedirs(cache_dir, exist_ok=True)
-
-                # Create unique filename
-                file_hash = hashlib.md5(file_content).hexdigest()[:8]
-                cache_filename = (
-                    f"{item_id}_{index}_{file_hash}_{file.filename}"
-                )
-                cache_path = os.path.join(cache_dir, cache_filename)
-
-                with open(cache_path, "wb") as cache_file:
-                    cache_file.write(file_content)
-
-                # Upload to eBay
-                picture_url, upload_error = (
-                    ebay_api.upload_site_hosted_pictures(
-                        file_content, file.filename
-                    )
-                )
+        # Get all uploaded files, ordered by their image_<n> index
+        image_files = sorted(
+            (
+                (int(m.group(1)), file)
+                for key, file in form.multi_items()
+                if (m := _IMAGE_FIELD.match(key)) and getattr(file, "filename", None)
+            ),
+            key=itemgetter(0),
+        )
 
-                if upload_error:
-                    if (
-                        isinstance(upload_error, dict)
-                        and upload_error.get("type") == "structured"
-                    ):
-                        upload_errors.extend(upload_error["errors"])
-                    else:
-                        upload_errors.append(
-                            {
-                                "short_message": f"Image Upload Failed: {file.filename}",
-                                "long_message": str(upload_error),
-                                "error_code": "IMAGE_UPLOAD_ERROR",
-                                "severity": "Error",
-                                "classification": "RequestError",
-                            }
-                        )
-                else:
-                    picture_urls.append(picture_url)
-
-            except Exception as e:
-                upload_errors.append(
-                    {
-                        "short_message": f"Image Processing Failed: {file.filename}",
-                        "long_message": f"Failed to process image: {str(e)}",
-                        "error_code": "IMAGE_PROCESS_ERROR",
-                        "severity": "Error",
-                        "classification": "SystemError",
-                    }
-                )
+        # Upload the images to eBay concurrently; gather keeps their order
+        results = await asyncio.gather(
+            *[
+                _upload_new_item_image(item_id, index, file)
+                for index, file in image_files
+            ]
+        )
+        for picture_url, errors in results:
+            if errors:
+                upload_errors.extend(errors)
+            else:
+                picture_urls.append(picture_url)
 
         # If there were image upload errors, return them
         if upload_errors:
-            return templates.TemplateResponse(
-                "new_item_form.html",
-                {
-                    "request": request,
-                    "item_id": item_id,
-                    "new_item_id": None,
-                    "fees": None,
-                    "structured_errors": upload_errors,
-                    "error": None,
-                    "edit_url": None,
-                },
+            return _render_new_item_form(
+                request, item_id=item_id, structured_errors=upload_errors
             )
 
         # Create the listing with uploaded images
-        new_item_id, fees, add_item_result = ebay_api.add_new_item(
-            title or "",
-            description or "",
-            item_specifics_xml or "",
+        return await _create_listing(
+            request,
+            item_id,
+            title,
+            description,
+            item_specifics_xml,
             picture_urls,
         )
 
-        # Check if it's an actual error (no new_item_id) or just warnings (has new_item_id)
-        if add_item_result and not new_item_id:
-            # This is an actual error - no listing was created
-            if (
-                isinstance(add_item_result, dict)
-                and add_item_result.get("type") == "structured"
-            ):
-                return templates.TemplateResponse(
-                    "new_item_form.html",
-                    {
-                        "request": request,
-                        "item_id": item_id,
-                        "new_item_id": None,
-                        "fees": None,
-                        "structured_errors": add_item_result["errors"],
-                        "error": None,
-                        "edit_url": None,
-                    },
-                )
-            else:
-                return templates.TemplateResponse(
-                    "new_item_form.html",
-                    {
-                        "request": request,
-                        "item_id": item_id,
-                        "new_item_id": None,
-                        "fees": None,
-                        "error": f"Error creating new item: {add_item_result}",
-                        "structured_errors": None,
-                        "edit_url": None,
-                    },
-                )
-
-        # Construct the edit draft URL
-        edit_url = f"https://www.ebay.com/sl/list?mode=SellLikeItem&draft_id={new_item_id}&ReturnURL=https%3A%2F%2Fwww.ebay.com%2Fsh%2Flst%2Fdrafts&DraftURL=https%3A%2F%2Fwww.ebay.com%2Fsh%2Flst%2Fdrafts"
-
-        # If there are warnings (add_item_result contains warnings), include them with the success
-        warnings = None
-        if (
-            add_item_result
-            and isinstance(add_item_result, dict)
-            and add_item_result.get("type") == "structured"
-        ):
-            warnings = add_item_result["errors"]  # These are actually warnings
-
-        return templates.TemplateResponse(
-            "new_item_form.html",
-            {
-                "request": request,
-                "item_id": item_id,
-                "new_item_id": new_item_id,
-                "fees": fees,
-                "edit_url": edit_url,
-                "error": None,
-                "structured_errors": warnings,
-            },
-        )
-
     except Exception as e:
-        return templates.TemplateResponse(
-            "new_item_form.html",
-            {
-                "request": request,
-                "item_id": None,
-                "new_item_id": None,
-                "fees": None,
-                "error": f"Unexpected error: {str(e)}",
-                "structured_errors": None,
-                "edit_url": None,
-            },
-        )
+        return _render_new_item_form(request, error=f"Unexpected error: {str(e)}")
@@ -0,0 +1,22 @@
+import hashlib
+
+from fastapi import Request, Response
+
+PAGE_CACHE_HEADERS = {"Cache-Control": "public, max-age=300"}
+
+
+def load_page(path: str) -> tuple[bytes, str]:
+    """
+    Reads a static HTML page once and returns its body and ETag.
+    """
+    with open(path, "rb") as f:
+        body = f.read()
+    return body, f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+def page_response(request: Request, page: tuple[bytes, str]) -> Response:
+    body, etag = page
+    headers = {**PAGE_CACHE_HEADERS, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/html", headers=headers)
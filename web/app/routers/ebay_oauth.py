@@ -1,18 +1,26 @@
 from fastapi import APIRouter
 
-from fastapi import Query, Response
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import Query, Request
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
 from web.app.ebay_auth import (
+    USER_OAUTH_TOKEN_FILE,
+    USER_TOKEN_EXPIRY_BUFFER,
     generate_oauth_authorization_url,
     exchange_code_for_tokens,
+    _load_user_token_data,
 )
 
 from web.app.logger import setup_logger
+from web.app.responses import load_page, page_response
 
 from typing import Optional
+import asyncio
+import os
 import time
 
+import jinja2
+
 router = APIRouter()
 
 logger = setup_logger(__name__)
@@ -30,47 +38,18 @@ async def get_ebay_oauth_url():
 
         auth_url = generate_oauth_authorization_url(redirect_uri, state)
 
-        return JSONResponse(content={"auth_url": auth_url, "state": state})
+        return ORJSONResponse(content={"auth_url": auth_url, "state": state})
     except Exception as e:
-        logger.error(f"Failed to generate OAuth URL: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        logger.error("Failed to generate OAuth URL: %s", e)
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
 
 
-@router.get("/ebay-oauth-accept")
-async def ebay_oauth_accept(
-    code: Optional[str] = Query(None),
-    state: Optional[str] = Query(None),
-    error: Optional[str] = Query(None),
-):
-    """Handle eBay OAuth accept callback and return a page that communicates with popup opener."""
-    if error:
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>eBay OAuth Error</title>
-        </head>
-        <body>
-            <h1>Authorization Error</h1>
-            <p>Error: {error}</p>
-            <script>
-                if (window.opener) {{
-                    window.opener.postMessage({{
-                        type: 'ebay_oauth_error',
-                        error: '{error}'
-                    }}, '*');
-                    window.close();
-                }} else {{
-                    document.body.innerHTML += '<p>Please close this window and try again.</p>';
-                }}
-            </script>
-        </body>
-        </html>
-        """
-        return Response(content=html_content, media_type="text/html")
+# Callback pages are compiled once; autoescape covers the HTML and tojson
+# makes the untrusted query values safe inside the inline scripts
+_templates = jinja2.Environment(autoescape=True)
 
-    if not code:
-        html_content = """
+_OAUTH_ERROR_PAGE = _templates.from_string(
+    """
         <!DOCTYPE html>
         <html>
         <head>
@@ -78,12 +57,12 @@ async def ebay_oauth_accept(
         </head>
         <body>
             <h1>Authorization Error</h1>
-            <p>No authorization code received.</p>
+            <p>{{ message }}</p>
             <script>
                 if (window.opener) {
                     window.opener.postMessage({
                         type: 'ebay_oauth_error',
-                        error: 'No authorization code received'
+                        error: {{ error|tojson }}
                     }, '*');
                     window.close();
                 } else {
@@ -93,10 +72,15 @@ async def ebay_oauth_accept(
         </body>
         </html>
         """
-        return Response(content=html_content, media_type="text/html")
+)
 
-    # Return success page that communicates with popup opener
-    html_content = f"""
+_NO_CODE_HTML = _OAUTH_ERROR_PAGE.render(
+    message="No authorization code received.",
+    error="No authorization code received",
+)
+
+_OAUTH_SUCCESS_PAGE = _templates.from_string(
+    """
     <!DOCTYPE html>
     <html>
     <head>
@@ -107,77 +91,99 @@ async def ebay_oauth_accept(
         <p>Exchanging authorization code for tokens...</p>
         <script>
             // Exchange code for tokens immediately
-            fetch('/api/ebay-exchange-token', {{
+            fetch('/api/ebay-exchange-token', {
                 method: 'POST',
-                headers: {{ 'Content-Type': 'application/json' }},
-                body: JSON.stringify({{ code: '{code}', state: '{state}' }})
-            }})
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ code: {{ code|tojson }}, state: {{ state|tojson }} })
+            })
             .then(response => response.json())
-            .then(data => {{
-                if (window.opener) {{
-                    window.opener.postMessage({{
+            .then(data => {
+                if (window.opener) {
+                    window.opener.postMessage({
                         type: 'ebay_oauth_success',
                         data: data
-                    }}, '*');
+                    }, '*');
                     window.close();
-                }} else {{
+                } else {
                     document.body.innerHTML = '<h1>Success!</h1><p>Authentication completed. You can close this window.</p>';
-                }}
-            }})
-            .catch(error => {{
-                if (window.opener) {{
-                    window.opener.postMessage({{
+                }
+            })
+            .catch(error => {
+                if (window.opener) {
+                    window.opener.postMessage({
                         type: 'ebay_oauth_error',
                         error: error.message
-                    }}, '*');
+                    }, '*');
                     window.close();
-                }} else {{
+                } else {
                     document.body.innerHTML = '<h1>Error</h1><p>Token exchange failed. Please try again.</p>';
-                }}
-            }});
+                }
+            });
         </script>
     </body>
     </html>
     """
-    return Response(content=html_content, media_type="text/html")
-
+)
 
-@router.get("/ebay-oauth-decline")
-async def ebay_oauth_decline(
-    error: Optional[str] = Query(None), state: Optional[str] = Query(None)
-):
-    """Handle eBay OAuth decline callback."""
-    error_message = error or "User declined authorization"
-    html_content = f"""
+_OAUTH_DECLINED_PAGE = _templates.from_string(
+    """
     <!DOCTYPE html>
     <html>
     <head>
         <title>eBay OAuth Declined</title>
         <style>
-            body {{ font-family: Arial, sans-serif; text-align: center; margin: 50px; }}
-            h1 {{ color: #d32f2f; }}
-            p {{ color: #666; }}
+            body { font-family: Arial, sans-serif; text-align: center; margin: 50px; }
+            h1 { color: #d32f2f; }
+            p { color: #666; }
         </style>
     </head>
     <body>
         <h1>Authorization Declined</h1>
         <p>You declined to authorize the application or an error occurred.</p>
-        <p>Error: {error_message}</p>
+        <p>Error: {{ error }}</p>
         <script>
-            if (window.opener) {{
-                window.opener.postMessage({{
+            if (window.opener) {
+                window.opener.postMessage({
                     type: 'ebay_oauth_error',
-                    error: '{error_message}'
-                }}, '*');
+                    error: {{ error|tojson }}
+                }, '*');
                 window.close();
-            }} else {{
+            } else {
                 document.body.innerHTML += '<p>You can close this window now.</p>';
-            }}
+            }
         </script>
     </body>
     </html>
     """
-    return Response(content=html_content, media_type="text/html")
+)
+
+
+@router.get("/ebay-oauth-accept")
+async def ebay_oauth_accept(
+    code: Optional[str] = Query(None),
+    state: Optional[str] = Query(None),
+    error: Optional[str] = Query(None),
+):
+    """Handle eBay OAuth accept callback and return a page that communicates with popup opener."""
+    if error:
+        return HTMLResponse(
+            _OAUTH_ERROR_PAGE.render(message=f"Error: {error}", error=error)
+        )
+
+    if not code:
+        return HTMLResponse(_NO_CODE_HTML)
+
+    # Return success page that communicates with popup opener
+    return HTMLResponse(_OAUTH_SUCCESS_PAGE.render(code=code, state=state))
+
+
+@router.get("/ebay-oauth-decline")
+async def ebay_oauth_decline(
+    error: Optional[str] = Query(None), state: Optional[str] = Query(None)
+):
+    """Handle eBay OAuth decline callback."""
+    error_message = error or "User declined authorization"
+    return HTMLResponse(_OAUTH_DECLINED_PAGE.render(error=error_message))
 
 
 @router.post("/api/ebay-exchange-token")
@@ -186,7 +192,7 @@ async def ebay_exchange_token(request_data: dict):
     try:
         code = request_data.get("code")
         if not code:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "Authorization code is required"},
             )
@@ -194,10 +200,11 @@ async def ebay_exchange_token(request_data: dict):
         # Use the same RuName as in the authorization request
         redirect_uri = "jesse_peterson-jessepet-UserSc-dhzfjwzn"
 
-        # Exchange code for tokens (also perists them)
-        exchange_code_for_tokens(code, redirect_uri)
+        # Exchange code for tokens (also perists them); this is a blocking
+        # HTTP call plus a file write, so keep it off the event loop
+        await asyncio.to_thread(exchange_code_for_tokens, code, redirect_uri)
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "success": True,
                 "message": "Tokens obtained and saved successfully",
@@ -205,40 +212,68 @@ async def ebay_exchange_token(request_data: dict):
         )
 
     except Exception as e:
-        logger.error(f"Token exchange failed: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        logger.error("Token exchange failed: %s", e)
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
+
+
+_DEMO_PAGE = load_page("web/static/ebay-oauth-demo.html")
+_TEST_PAGE = load_page("web/static/ebay-oauth-test.html")
 
 
 @router.get("/ebay-oauth-demo")
-async def ebay_oauth_demo():
-    return FileResponse("web/static/ebay-oauth-demo.html")
+async def ebay_oauth_demo(request: Request):
+    return page_response(request, _DEMO_PAGE)
 
 
 @router.get("/ebay-oauth-test")
-async def ebay_oauth_test():
-    return FileResponse("web/static/ebay-oauth-test.html")
+async def ebay_oauth_test(request: Request):
+    return page_response(request, _TEST_PAGE)
+
+
+# Token status is polled by the UI; reuse the parsed token file for a few
+# seconds unless the file changes underneath
+TOKEN_STATUS_CACHE_TTL = 2.0
+_token_status_cache = {"expires_at": 0.0, "mtime": None, "data": None}
+
+
+def _read_token_data() -> dict:
+    try:
+        mtime = os.stat(USER_OAUTH_TOKEN_FILE).st_mtime
+    except FileNotFoundError:
+        mtime = None
+    if (
+        _token_status_cache["data"] is not None
+        and mtime == _token_status_cache["mtime"]
+        and time.monotonic() < _token_status_cache["expires_at"]
+    ):
+        return _token_status_cache["data"]
+
+    token_data = _load_user_token_data()
+    _token_status_cache["data"] = token_data
+    _token_status_cache["mtime"] = mtime
+    _token_status_cache["expires_at"] = time.monotonic() + TOKEN_STATUS_CACHE_TTL
+    return token_data
 
 
 @router.get("/api/ebay-token-status")
 async def ebay_token_status():
     """Check eBay token expiration status."""
     try:
-        from web.app.ebay_auth import (
-            _load_user_token_data,
-            _is_user_token_expired,
-        )
-
-        token_data = _load_user_token_data()
+        token_data = await asyncio.to_thread(_read_token_data)
         auth_token = token_data.get("AUTH_TOKEN", "")
         expires_at = token_data.get("EXPIRES_AT")
 
         if not auth_token:
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"status": "no_token", "message": "No AUTH_TOKEN found"}
             )
 
-        is_expired = _is_user_token_expired(auth_token)
         current_time = int(time.time())
+        # Same rule as _is_user_token_expired, without re-reading the file
+        is_expired = (
+            not expires_at
+            or current_time >= expires_at - USER_TOKEN_EXPIRY_BUFFER
+        )
 
         status_info = {
             "status": "expired" if is_expired else "valid",
@@ -251,8 +286,8 @@ async def ebay_token_status():
         if expires_at:
             status_info["seconds_until_expiry"] = expires_at - current_time
 
-        return JSONResponse(content=status_info)
+        return ORJSONResponse(content=status_info)
 
     except Exception as e:
-        logger.error(f"Token status check failed: {e}")
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        logger.error("Token status check failed: %s", e)
+        return ORJSONResponse(status_code=500, content={"error": str(e)})
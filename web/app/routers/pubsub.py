@@ -1,8 +1,11 @@
 from fastapi import APIRouter, WebSocket
 from pydantic import BaseModel
 from typing import Dict, Any
+import asyncio
 import uuid
 
+import orjson
+
 from web.app.logger import setup_logger
 
 router = APIRouter(prefix="/ps")
@@ -23,7 +26,7 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
 
     # Generate a unique client ID
-    client_id = str(uuid.uuid4())
+    client_id = uuid.uuid4().hex
     active_connections[client_id] = websocket
 
     try:
@@ -35,32 +38,40 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.receive_text()  # Just keep the connection alive
 
     except Exception as e:
-        print(f"WebSocket connection closed: {e}")
+        logger.info("WebSocket %s closed: %s", client_id, e)
     finally:
         # Clean up when connection is closed
-        if client_id in active_connections:
-            del active_connections[client_id]
+        active_connections.pop(client_id, None)
 
 
 @router.post("/publish")
 async def publish_data(payload: DataPayload):
-    client_id = payload.client_id
-
     # if client_id not in active_connections:
     #     return {"status": "error", "message": "Client not found"}
 
-    # Send data to the specific client
-    logger.info("Publish......")
-    try:
-        for i in active_connections:
-            logger.info(f"Sent to: {i}")
-            await active_connections[i].send_json({"data": payload.data})
-            # await conn.send_json({"data": payload.data})
-
-    except Exception as e:
-        if client_id in active_connections:
-            del active_connections[client_id]
-        return {"status": "error", "message": str(e)}
+    # Send data to every client; encode once and send concurrently so one
+    # slow client doesn't hold up the rest
+    message = orjson.dumps({"data": payload.data}).decode("utf-8")
+    connections = list(active_connections.items())
+    results = await asyncio.gather(
+        *(ws.send_text(message) for _, ws in connections),
+        return_exceptions=True,
+    )
+
+    # Failed sockets are left in place: each connection's own handler is the
+    # only one that removes it, in its finally block
+    error = None
+    failures = 0
+    for (cid, _), result in zip(connections, results):
+        if isinstance(result, Exception):
+            logger.info("Send to %s failed: %s", cid, result)
+            error = error or result
+            failures += 1
+    logger.info(
+        "Broadcast to %d clients (failures=%d)", len(connections), failures
+    )
+    if error is not None:
+        return {"status": "error", "message": str(error)}
 
     return {"status": "success", "message": "Data sent successfully"}
 